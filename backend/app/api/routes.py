@@ -10,20 +10,19 @@ from fastapi import Body
 from app.core.config import settings
 from app.services.msg_parser import parse_msg_file
 from app.services.jira_service import get_jira_ticket
-from app.services.vector_service import add_issue_to_vectordb, delete_issue, get_all_chroma_collections_data
+from app.services.vector_service import add_issues_to_vectordb, delete_issue, get_all_chroma_collections_data
 from app.models import  IssueResponse, SearchQuery
-from pydantic import BaseModel
 from app.services.vector_service import clear_collection
 
 from app.services.vector_service import search_similar_issues
 from app.services.confluence_service import confluence_search
-from app.services.confluence_service import add_confluence_page_to_vectordb
+from app.services.confluence_service import add_confluence_pages_to_vectordb
 from app.services.llm_service import generate_summary_from_results
 from app.services.stackoverflow_service import (
     add_stackoverflow_qa_to_vectordb,
     search_similar_stackoverflow_content
 )
-from app.utils.similarity import compute_similarity_score
+from app.utils.similarity import distances_to_similarities
 from app.services.unified_rag_service import unified_rag_search
 
 logger = logging.getLogger(__name__)
@@ -71,11 +70,6 @@ class StackOverflowSearchRequest(BaseModel):
 class LLMTopResultsCountRequest(BaseModel):
     llm_top_results_count: int
 
-logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-
-router = APIRouter()
-
 @router.get("/config/similarity-threshold")
 async def get_similarity_threshold():
     """
@@ -135,34 +129,36 @@ async def ingest_confluence_page(payload: ConfluenceIngestRequest):
     Ingest multiple Confluence pages by URL and store their embeddings in the vector DB.
     """
     results = []
-    for url in payload.confluence_urls:
-        try:
-            page_id = add_confluence_page_to_vectordb(
-                url,
-                augment_metadata=payload.augment_metadata,
-                normalize_language=payload.normalize_language,
-                target_language=payload.target_language,
-                use_llm=payload.use_llm
-            )
-            if not page_id:
-                results.append({
-                    "confluence_url": url,
-                    "status": "error",
-                    "message": "Failed to ingest Confluence page"
-                })
-                continue
-            results.append({
-                "confluence_url": url,
-                "status": "success",
-                "message": "Confluence page ingested successfully",
-                "page_id": page_id
-            })
-        except Exception as e:
+    try:
+        # All pages are fetched concurrently and embedded in one batch
+        page_ids = add_confluence_pages_to_vectordb(
+            payload.confluence_urls,
+            augment_metadata=payload.augment_metadata,
+            normalize_language=payload.normalize_language,
+            target_language=payload.target_language,
+            use_llm=payload.use_llm
+        )
+    except Exception as e:
+        return {
+            "results": [
+                {"confluence_url": url, "status": "error", "message": str(e)}
+                for url in payload.confluence_urls
+            ]
+        }
+    for url, page_id in zip(payload.confluence_urls, page_ids):
+        if not page_id:
             results.append({
                 "confluence_url": url,
                 "status": "error",
-                "message": str(e)
+                "message": "Failed to ingest Confluence page"
             })
+            continue
+        results.append({
+            "confluence_url": url,
+            "status": "success",
+            "message": "Confluence page ingested successfully",
+            "page_id": page_id
+        })
     return {
         "results": results
     }
@@ -264,11 +260,11 @@ async def search_stackoverflow_qa(payload: StackOverflowSearchRequest):
         metadatas = results["metadatas"][0] if "distances" in results and results["distances"] else results["metadatas"]
         documents = results["documents"][0] if "distances" in results and results["distances"] else results["documents"]
         distances = results["distances"][0] if "distances" in results and results["distances"] else [0.0] * len(ids)
+        similarity_scores = distances_to_similarities(distances)
         for i, item_id in enumerate(ids):
             metadata = metadatas[i]
             document = documents[i]
-            distance = distances[i]
-            similarity_score = compute_similarity_score(distance)
+            similarity_score = similarity_scores[i]
             if similarity_score == 0.0:
                 continue  # Skip results with 0.00% similarity
             formatted.append({
@@ -303,6 +299,7 @@ async def search_confluence_pages(payload: ConfluenceSearchRequest):
         metadatas = results["metadatas"][0] if "distances" in results and results["distances"] else results["metadatas"]
         documents = results["documents"][0] if "distances" in results and results["distances"] else results["documents"]
         distances = results["distances"][0] if "distances" in results and results["distances"] else [0.0] * len(ids)
+        similarity_scores = distances_to_similarities(distances)
         seen = set()
         for i, page_id in enumerate(ids):
             metadata = metadatas[i]
@@ -312,8 +309,7 @@ async def search_confluence_pages(payload: ConfluenceSearchRequest):
             if unique_key in seen:
                 continue
             seen.add(unique_key)
-            distance = distances[i]
-            similarity_score = compute_similarity_score(distance)
+            similarity_score = similarity_scores[i]
             if similarity_score == 0.0:
                 continue  # Skip results with 0.00% similarity
             formatted.append({
@@ -471,7 +467,6 @@ async def clear_chroma_collection(collection_name: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-from app.core.config import settings
 from app.services.faiss_client import FaissClient # Add import for FaissClient
 
 @router.get("/chroma-collections")
@@ -541,26 +536,30 @@ async def ingest_msg_dir(
                     logger.error(f"Error saving file {file.filename}: {file_save_err}")
                     logger.error(traceback.format_exc())
             results = []
+            parsed = []
             for file_path in saved_file_paths:
                 logger.info(f"Calling parse_msg_file for: {file_path}")
                 msg_data = parse_msg_file(file_path)
-                if isinstance(msg_data, dict) and msg_data.get("status") == "error":
-                    results.append(msg_data)
-                    continue
-                try:
-                    # Pass augmentation params to add_issue_to_vectordb
-                    issue_id = add_issue_to_vectordb(
-                        msg_data=msg_data,
-                        augment_metadata=augment_metadata,
-                        normalize_language=normalize_language,
-                        target_language=target_language
-                    )
+                results.append(msg_data)
+                if not (isinstance(msg_data, dict) and msg_data.get("status") == "error"):
+                    parsed.append(msg_data)
+            # All parsed files are embedded in one batch and written to the collection in one call
+            try:
+                issue_ids = add_issues_to_vectordb(
+                    msg_data_list=parsed,
+                    augment_metadata=augment_metadata,
+                    normalize_language=normalize_language,
+                    target_language=target_language
+                )
+            except Exception as e:
+                issue_ids = [e] * len(parsed)
+            for msg_data, issue_id in zip(parsed, issue_ids):
+                if isinstance(issue_id, str):
                     msg_data["issue_id"] = issue_id
                     msg_data["status"] = "success"
-                except Exception as e:
+                else:
                     msg_data["status"] = "error"
-                    msg_data["error"] = str(e)
-                results.append(msg_data)
+                    msg_data["error"] = str(issue_id)
             return {"status": "success", "results": results}
     except Exception as e:
         logger.error(f"Error in ingest_msg_dir: {e}")
@@ -61,8 +61,14 @@ class Settings(BaseSettings):
     # Vector DB settings
     VECTOR_DB_PATH: str = os.getenv("VECTOR_DB_PATH", "./data/chroma")
     CHROMA_USE_HTTP: bool = os.getenv("CHROMA_USE_HTTP", "false").lower() == "true"
+    CHROMA_HOST: str = os.getenv("CHROMA_HOST", "localhost")
+    CHROMA_PORT: int = int(os.getenv("CHROMA_PORT", 8000))
     USE_FAISS: bool = os.getenv("USE_FAISS", "false").lower() == "true"
     FAISS_INDEX_PATH: str = os.getenv("FAISS_INDEX_PATH", "./data/faiss")
+    # Storage precision for FAISS vectors: float32, float16 or int8 (ChromaDB always stores float32)
+    EMBED_DTYPE: str = os.getenv("EMBED_DTYPE", "float32")
+    # BM25 indexes are saved here keyed by corpus fingerprint and memory-mapped on reload ("" disables)
+    BM25_INDEX_PATH: str = os.getenv("BM25_INDEX_PATH", "./data/bm25")
     
     # OpenRouter LLM API settings
     OPENROUTER_API_KEY: str = os.getenv("OPENROUTER_API_KEY", "")
@@ -73,7 +79,20 @@ class Settings(BaseSettings):
     
     # LLM settings
     EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    # "sentence-transformers" or "model2vec" (static embeddings, much faster on CPU)
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "sentence-transformers")
+    M2V_MODEL: str = os.getenv("M2V_MODEL", "minishlab/M2V_base_output")
     MODEL_LOCAL_PATH: Optional[str] = os.getenv("MODEL_LOCAL_PATH", None)
+    # CPU inference tuning for the embedding model (0 = use all cores)
+    TORCH_THREADS: int = int(os.getenv("TORCH_THREADS", 0))
+    EMBEDDING_BF16: bool = os.getenv("EMBEDDING_BF16", "false").lower() == "true"
+    # Embed and store ingested issues on a background worker instead of the request thread
+    ASYNC_INGEST: bool = os.getenv("ASYNC_INGEST", "false").lower() == "true"
+    EMBED_BATCH: int = int(os.getenv("EMBED_BATCH", 32))
+    # Concurrent LLM requests used for ingest-time augmentation
+    LLM_NUM_THREADS: int = int(os.getenv("LLM_NUM_THREADS", 16))
+    # bm25s scoring backend: "numpy", "numba" (JIT-compiled, parallel) or "auto" (numba when installed)
+    BM25_BACKEND: str = os.getenv("BM25_BACKEND", "auto")
     _SIMILARITY_THRESHOLD_ENV: float = float(os.getenv("SIMILARITY_THRESHOLD", 0.1))
     _LLM_TOP_RESULTS_COUNT_ENV: int = int(os.getenv("LLM_TOP_RESULTS_COUNT", 3))
 
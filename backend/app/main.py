@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 import uvicorn
 
 from app.api.routes import router as api_router
@@ -12,7 +13,9 @@ setup_logging()
 app = FastAPI(
     title="Support Buddy",
     description="GenAI solution for handling support issues / queries",
-    version="0.1.0"
+    version="0.1.0",
+    # Search results and Jira tickets are large nested dicts; orjson serializes them several times faster
+    default_response_class=ORJSONResponse,
 )
 
 # Configure CORS
@@ -32,4 +35,4 @@ async def root():
     return {"message": "Welcome to Support Buddy API"}
 
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host="0.0.0.0", port=9000, reload=True)
\ No newline at end of file
+    uvicorn.run("app.main:app", host="0.0.0.0", port=9000, reload=True, reload_dirs=["app"])
\ No newline at end of file
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
@@ -29,6 +29,12 @@ class IssueResponse(BaseModel):
     similarity_score: Optional[float] = None  # Used in search results
     llm_answer: Optional[str] = None  # Optional LLM-generated answer
 
+    @field_validator("received_date", mode="before")
+    @classmethod
+    def empty_received_date_to_none(cls, value):
+        # Vector DB metadata stores a missing date as "", which is not a valid datetime
+        return value or None
+
 class SearchQuery(BaseModel):
     """Schema for searching support issues / queries"""
     query_text: str
@@ -1,12 +1,23 @@
 import chromadb
 import logging
 import os
+import threading
+from functools import lru_cache
+from typing import Callable, Dict, List
 from app.core.config import settings
 from chromadb.config import Settings
 
 logger = logging.getLogger(__name__)
 
 _vector_db_client = None # Global cache for the client
+_vector_db_client_lock = threading.Lock()
+
+# Embeddings are stored L2-normalized, so inner product equals cosine similarity.
+# Chroma reports "ip" distances as 1 - <a, b>.
+COLLECTION_METADATA = {"hnsw:space": "ip"}
+
+# collection name -> callbacks that drop state built on it (the services' cached RAG pipelines)
+_invalidation_callbacks: Dict[str, List[Callable[[], None]]] = {}
 
 def get_vector_db_client(db_path: str = None):
     """
@@ -16,10 +27,16 @@ def get_vector_db_client(db_path: str = None):
     Logs the persist directory and current working directory for debugging.
     Caches the client instance.
     """
-    global _vector_db_client
     if _vector_db_client is not None:
         return _vector_db_client
+    # Only one thread builds the client; the others wait for it instead of creating their own
+    with _vector_db_client_lock:
+        if _vector_db_client is not None:
+            return _vector_db_client
+        return _create_vector_db_client(db_path)
 
+def _create_vector_db_client(db_path: str = None):
+    global _vector_db_client
     try:
         use_faiss = os.getenv("USE_FAISS", "false").lower() == "true"
 
@@ -33,11 +50,10 @@ def get_vector_db_client(db_path: str = None):
         else:
             chroma_use_http = os.getenv("CHROMA_USE_HTTP", "false").lower() == "true"
             if chroma_use_http:
-                # Default to localhost:8000, can be extended to support env config
-                logger.info("Using ChromaDB HttpClient (server mode)")
+                logger.info(f"Using ChromaDB HttpClient (server mode) at {settings.CHROMA_HOST}:{settings.CHROMA_PORT}")
                 _vector_db_client = chromadb.HttpClient(
-                    host="localhost",
-                    port=8000,
+                    host=settings.CHROMA_HOST,
+                    port=settings.CHROMA_PORT,
                     settings=Settings(anonymized_telemetry=False)
                 )
                 return _vector_db_client
@@ -60,26 +76,44 @@ def get_collection(collection_name: str):
     """
     Gets or creates a collection from the configured vector database (ChromaDB or FAISS).
     If collection does not exist, it will be created.
+    The handle is cached per name, so the catalog round-trip happens once per process.
     """
+    return _collection(collection_name)
+
+@lru_cache(maxsize=8)
+def _collection(collection_name: str):
     client = get_vector_db_client()
     # Try to get or create the collection, robust to non-existence
     try:
         # Many Chroma/FAISS clients support get_or_create_collection, but fallback if not
         if hasattr(client, 'get_or_create_collection'):
-            return client.get_or_create_collection(collection_name)
+            return client.get_or_create_collection(collection_name, metadata=COLLECTION_METADATA)
         elif hasattr(client, 'get_collection') and hasattr(client, 'create_collection'):
             try:
                 return client.get_collection(collection_name)
             except Exception:
-                return client.create_collection(collection_name)
+                return client.create_collection(collection_name, metadata=COLLECTION_METADATA)
         else:
             raise RuntimeError("Vector DB client does not support collection creation.")
     except Exception as e:
         # Last resort: try to create the collection
         if hasattr(client, 'create_collection'):
-            return client.create_collection(collection_name)
+            return client.create_collection(collection_name, metadata=COLLECTION_METADATA)
         raise
 
+def on_collection_invalidated(collection_name: str, callback: Callable[[], None]):
+    """Register callback to run whenever collection_name is cleared, dropped or recreated."""
+    _invalidation_callbacks.setdefault(collection_name, []).append(callback)
+
+def invalidate_collection_cache(collection_name: str):
+    """
+    Drop cached handles to a collection and everything built on it.
+    Call after deleting, recreating or clearing the collection.
+    """
+    _collection.cache_clear()
+    for callback in _invalidation_callbacks.get(collection_name, []):
+        callback()
+
 def clear_collection(collection_name: str) -> bool:
     """
     Clears a collection. Note: FAISS implementation might differ.
@@ -88,6 +122,8 @@ def clear_collection(collection_name: str) -> bool:
     try:
         client = get_vector_db_client()
         use_faiss = os.getenv("USE_FAISS", "false").lower() == "true"
+        # The collection may be deleted and recreated below, which invalidates cached handles
+        invalidate_collection_cache(collection_name)
 
         if use_faiss:
             collection = client.get_collection(collection_name)
@@ -97,7 +133,7 @@ def clear_collection(collection_name: str) -> bool:
             else:
                 logger.warning(f"FAISS collection '{collection_name}' not found or does not support clear(). Deleting and recreating.")
                 client.delete_collection(collection_name)
-                client.get_or_create_collection(collection_name) # Recreate it empty
+                client.get_or_create_collection(collection_name, metadata=COLLECTION_METADATA) # Recreate it empty
                 logger.info(f"FAISS collection '{collection_name}' deleted and recreated.")
             return True
         else:
@@ -121,7 +157,7 @@ def clear_collection(collection_name: str) -> bool:
                  try:
                      client.delete_collection(collection_name)
                      logger.info(f"Deleted Index collection '{collection_name}' as fallback.")
-                     client.create_collection(collection_name) # Recreate empty
+                     client.create_collection(collection_name, metadata=COLLECTION_METADATA) # Recreate empty
                  except Exception as del_err:
                      logger.error(f"Failed to delete and recreate ChromaDB collection '{collection_name}': {del_err}")
             return True
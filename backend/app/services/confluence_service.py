@@ -1,14 +1,14 @@
 import logging
 from app.core.config import settings
-import hashlib
 import requests
 import os
 from typing import Optional, Dict, Any, List
 from datetime import datetime
-from app.services.chroma_client import get_vector_db_client
+from concurrent.futures import ThreadPoolExecutor
+from app.services.chroma_client import get_vector_db_client, COLLECTION_METADATA, on_collection_invalidated
 from app.services.embedding_service import get_embedding_model
 from app.utils.rag_utils import load_components, create_bm25_index, create_retrievers, create_rag_pipeline, index_vector_data
-from app.utils.similarity import compute_similarity_score, compute_text_similarity_score
+from app.utils.similarity import compute_text_similarity_scores
 from app.utils.llm_augmentation import llm_summarize
 from app.models.models import ConfluencePage
 from app.utils.dspy_utils import get_openrouter_llm
@@ -43,13 +43,20 @@ def log_search_failure(error):
 _rag_pipeline = None
 _corpus = None
 
+def _reset_rag_pipeline():
+    global _rag_pipeline, _corpus
+    _rag_pipeline = None
+    _corpus = None
+
+on_collection_invalidated(COLLECTION_NAME, _reset_rag_pipeline)
+
 def _get_rag_pipeline(use_llm: bool = False):
     global _rag_pipeline, _corpus
     if _rag_pipeline is not None:
         return _rag_pipeline
     from app.core.config import settings
     client = get_vector_db_client()
-    collection = client.get_or_create_collection(COLLECTION_NAME)
+    collection = client.get_or_create_collection(COLLECTION_NAME, metadata=COLLECTION_METADATA)
     all_docs_result = collection.get(include=['documents'])
     _corpus = all_docs_result.get("documents", [])
 
@@ -142,42 +149,77 @@ def add_confluence_page_to_vectordb(
     target_language: str = "en",
     use_llm: bool = False
 ) -> Optional[str or List[str]]:
-    log_ingest_start(confluence_url, extra_metadata)
+    return add_confluence_pages_to_vectordb(
+        [confluence_url],
+        extra_metadata=extra_metadata,
+        llm_augment=llm_augment,
+        augment_metadata=augment_metadata,
+        normalize_language=normalize_language,
+        target_language=target_language,
+        use_llm=use_llm
+    )[0]
+
+def add_confluence_pages_to_vectordb(
+    confluence_urls: List[str],
+    extra_metadata: Optional[Dict[str, Any]] = None,
+    llm_augment: Optional[Any] = None,
+    augment_metadata: bool = False,
+    normalize_language: bool = False,
+    target_language: str = "en",
+    use_llm: bool = False
+) -> List[Optional[str]]:
+    """
+    Ingest several Confluence pages at once: pages are fetched concurrently, then embedded
+    in one batched encode and stored with a single collection add.
+    Returns the stored page ID for each URL (aligned with confluence_urls), or None for a
+    page that could not be fetched or was already ingested.
+    """
+    for url in confluence_urls:
+        log_ingest_start(url, extra_metadata)
+    if not confluence_urls:
+        return []
     try:
-        page_data = fetch_confluence_content(confluence_url)
-        if not page_data or not page_data.get("content"):
-            raise ValueError("Failed to fetch content from Confluence URL")
-        content = page_data["content"]
-        display_title = page_data.get("display_title")
-        html_body = page_data.get("html_body")
-        client = get_vector_db_client()
-        embedder = get_embedding_model()
-        content_hash = hashlib.sha256((content or "").encode("utf-8")).hexdigest()
-        page_id = f"confluence_{datetime.now().strftime('%Y%m%d%H%M%S')}"
-        # Use ConfluencePage model for structured metadata
-        page_obj = ConfluencePage(
-            page_id=page_id,
-            title=display_title or "Confluence Page",
-            url=confluence_url,
-            space=page_data.get("space"),
-            labels=page_data.get("labels"),
-            creator=page_data.get("creator"),
-            created=page_data.get("created"),
-            updated=page_data.get("updated"),
-            content=content,
-            similarity_score=None,
-            metadata=None if extra_metadata is None else sanitize_metadata(extra_metadata),
-        )
-        metadata = sanitize_metadata(page_obj.model_dump())
+        with ThreadPoolExecutor(max_workers=min(8, len(confluence_urls))) as executor:
+            pages = list(executor.map(fetch_confluence_content, confluence_urls))
+        stamp = datetime.now().strftime('%Y%m%d%H%M%S')
+        documents, doc_ids, metadatas, url_ids = [], [], [], []
+        for i, (confluence_url, page_data) in enumerate(zip(confluence_urls, pages)):
+            if not page_data or not page_data.get("content"):
+                log_ingest_failure(f"Failed to fetch content from Confluence URL {confluence_url}")
+                url_ids.append(None)
+                continue
+            content = page_data["content"]
+            # Pages ingested in the same second need distinct IDs
+            page_id = f"confluence_{stamp}" if len(confluence_urls) == 1 else f"confluence_{stamp}_{i}"
+            # Use ConfluencePage model for structured metadata
+            page_obj = ConfluencePage(
+                page_id=page_id,
+                title=page_data.get("display_title") or "Confluence Page",
+                url=confluence_url,
+                space=page_data.get("space"),
+                labels=page_data.get("labels"),
+                creator=page_data.get("creator"),
+                created=page_data.get("created"),
+                updated=page_data.get("updated"),
+                content=content,
+                similarity_score=None,
+                metadata=None if extra_metadata is None else sanitize_metadata(extra_metadata),
+            )
+            documents.append(content)
+            doc_ids.append(page_id)
+            metadatas.append(sanitize_metadata(page_obj.model_dump()))
+            url_ids.append(page_id)
+        if not documents:
+            return url_ids
         # Only use LLM augmentation if use_llm is True
         llm_augment_to_use = llm_augment or llm_summarize if use_llm else None
         ids = index_vector_data(
-            client=client,
-            embedder=embedder,
-            documents=[content],
-            doc_ids=[page_id],
+            client=get_vector_db_client(),
+            embedder=get_embedding_model(),
+            documents=documents,
+            doc_ids=doc_ids,
             collection_name="confluence_pages",
-            metadatas=[metadata],
+            metadatas=metadatas,
             clear_existing=False,
             deduplicate=True,
             llm_augment=llm_augment_to_use,
@@ -186,13 +228,12 @@ def add_confluence_page_to_vectordb(
             target_language=target_language
         )
         log_ingest_success(ids)
-        # TEST COMPAT: return string if only one id
-        if isinstance(ids, list) and len(ids) == 1:
-            return ids[0]
-        return ids
+        # Pages dropped as duplicates were not stored
+        stored = set(ids)
+        return [page_id if page_id in stored else None for page_id in url_ids]
     except Exception as e:
         log_ingest_failure(e)
-        return None
+        return [None] * len(confluence_urls)
 
 def confluence_search(query_text: str, limit: int = 10, use_llm: bool = False) -> List[Dict[str, Any]]:
     """
@@ -204,6 +245,8 @@ def confluence_search(query_text: str, limit: int = 10, use_llm: bool = False) -
         rag_pipeline = _get_rag_pipeline(use_llm=use_llm)
         rag_result = rag_pipeline.forward(query_text, use_llm=use_llm)
         formatted = []
+        # Results scored from their text are embedded together after the loop
+        pending_scores = []
         for idx, context in enumerate(rag_result.context):
             # Prioritize score directly from RAG context if available
             similarity_score = None
@@ -218,24 +261,20 @@ def confluence_search(query_text: str, limit: int = 10, use_llm: bool = False) -
                 similarity_score = float(context['similarity'])
             # Fallback: Check for distance-based score
             elif hasattr(context, 'distance') and context.distance is not None:
-                from app.utils.similarity import compute_similarity_score
-                similarity_score = compute_similarity_score(float(context.distance))
+                from app.utils.similarity import distance_to_similarity
+                similarity_score = distance_to_similarity(float(context.distance))
             elif isinstance(context, dict) and 'distance' in context and context['distance'] is not None:
-                from app.utils.similarity import compute_similarity_score
-                similarity_score = compute_similarity_score(float(context['distance']))
+                from app.utils.similarity import distance_to_similarity
+                similarity_score = distance_to_similarity(float(context['distance']))
             # Fallback: Compute text similarity if necessary (less preferred)
             elif hasattr(context, 'long_text') and isinstance(context.long_text, str):
-                from app.utils.similarity import compute_text_similarity_score
-                similarity_score = compute_text_similarity_score(query_text, context.long_text)
+                pending_scores.append((len(formatted), context.long_text))
             elif isinstance(context, dict) and 'long_text' in context:
-                from app.utils.similarity import compute_text_similarity_score
-                similarity_score = compute_text_similarity_score(query_text, context['long_text'])
+                pending_scores.append((len(formatted), context['long_text']))
             elif hasattr(context, 'text') and isinstance(context.text, str):
-                from app.utils.similarity import compute_text_similarity_score
-                similarity_score = compute_text_similarity_score(query_text, context.text)
+                pending_scores.append((len(formatted), context.text))
             elif isinstance(context, dict) and 'text' in context:
-                from app.utils.similarity import compute_text_similarity_score
-                similarity_score = compute_text_similarity_score(query_text, context['text'])
+                pending_scores.append((len(formatted), context['text']))
             else:
                 # Default if no score can be determined
                 similarity_score = 0.0
@@ -253,6 +292,10 @@ def confluence_search(query_text: str, limit: int = 10, use_llm: bool = False) -
                 "similarity_score": similarity_score,
                 "metadata": context.get('metadata', {}) if isinstance(context, dict) else {},
             })
+        if pending_scores:
+            scores = compute_text_similarity_scores(query_text, [text for _, text in pending_scores])
+            for (pos, _), score in zip(pending_scores, scores):
+                formatted[pos]["similarity_score"] = score
         log_search_success(len(formatted))
         return formatted
     except Exception as e:
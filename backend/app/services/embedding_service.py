@@ -1,33 +1,118 @@
-from sentence_transformers import SentenceTransformer
+import os
 from app.core.config import settings
+
+# Thread pools must be sized before torch is first imported to take effect
+_num_threads = settings.TORCH_THREADS or os.cpu_count() or 1
+os.environ.setdefault("OMP_NUM_THREADS", str(_num_threads))
+os.environ.setdefault("MKL_NUM_THREADS", str(_num_threads))
+
+import numpy as np
+import hashlib
 import logging
+import threading
+from cachetools import LRUCache
 
 logger = logging.getLogger(__name__)
 
 _model_instance = None
+# Name or path _model_instance was loaded from; the query embedding cache is keyed by it
+_model_name = None
+# Concurrent first requests (e.g. the parallel multi-source search) must not each load the model
+_model_lock = threading.Lock()
+
+# (model name, sha256 of the query) -> normalized query embedding. A multi-source search runs one
+# retriever per source over the same query, so all but the first hit the cache.
+_QUERY_EMBEDDING_CACHE = LRUCache(maxsize=1024)
+_QUERY_EMBEDDING_CACHE_LOCK = threading.Lock()
+
+def _configure_torch():
+    import torch
+    torch.set_num_threads(_num_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Can only be set once, before any inter-op parallel work has started
+        pass
+    torch.backends.mkldnn.enabled = True
+
+class StaticEmbeddingModel:
+    """
+    Adapter giving a Model2Vec StaticModel the SentenceTransformer encode() interface
+    used across the app (normalize_embeddings, batch_size, show_progress_bar).
+    """
+    def __init__(self, model_name: str):
+        from model2vec import StaticModel
+        self._model = StaticModel.from_pretrained(model_name)
+
+    def encode(self, sentences, normalize_embeddings: bool = False, batch_size: int = 1024, show_progress_bar: bool = False, **kwargs):
+        embeddings = self._model.encode(sentences, batch_size=batch_size, show_progressbar=show_progress_bar)
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+            embeddings = embeddings / np.maximum(norms, 1e-12)
+        return embeddings
 
 def get_embedding_model(embedding_model: str = None, device: str = 'cpu', model_path: str = None):
     """
     Singleton loader for the sentence transformer embedding model.
     If model_path is provided, loads model from the local folder.
+    With EMBEDDING_BACKEND=model2vec, loads settings.M2V_MODEL as a static embedding model instead.
     Returns:
-        SentenceTransformer model instance
-    """
-    global _model_instance
-    if _model_instance is None:
-        try:
-            # Always load on CPU
-            # Use model_path from argument, then from settings, else fallback
-            final_model_path = model_path or settings.MODEL_LOCAL_PATH
-            if final_model_path:
-                _model_instance = SentenceTransformer(final_model_path, device=device)
-            else:
-                _model_instance = SentenceTransformer(embedding_model or settings.EMBEDDING_MODEL, device=device)
-        except Exception as e:
-            logger.error(f"Error initializing embedding model: {str(e)}")
-            raise
+        SentenceTransformer (or StaticEmbeddingModel) instance
+    """
+    global _model_instance, _model_name
+    if _model_instance is not None:
+        return _model_instance
+    with _model_lock:
+        if _model_instance is None:
+            try:
+                # Always load on CPU
+                # Use model_path from argument, then from settings, else fallback
+                final_model_path = model_path or settings.MODEL_LOCAL_PATH
+                if settings.EMBEDDING_BACKEND == "model2vec":
+                    name = final_model_path or settings.M2V_MODEL
+                    _model_instance = StaticEmbeddingModel(name)
+                else:
+                    # torch and sentence-transformers are imported on first load, not when the app imports this module
+                    _configure_torch()
+                    from sentence_transformers import SentenceTransformer
+                    name = final_model_path or embedding_model or settings.EMBEDDING_MODEL
+                    _model_instance = SentenceTransformer(name, device=device)
+                _model_name = f"{settings.EMBEDDING_BACKEND}:{name}"
+            except Exception as e:
+                logger.error(f"Error initializing embedding model: {str(e)}")
+                raise
     return _model_instance
 
+def encode(model, texts, **kwargs):
+    """
+    Encode with the model, under bfloat16 autocast when EMBEDDING_BF16 is enabled.
+    Embeddings are L2-normalized unless the caller overrides normalize_embeddings.
+    """
+    kwargs.setdefault("normalize_embeddings", True)
+    if settings.EMBEDDING_BF16:
+        import torch
+        with torch.autocast(device_type="cpu", dtype=torch.bfloat16):
+            return model.encode(texts, **kwargs)
+    return model.encode(texts, **kwargs)
+
 def get_embedding(text: str, model_path: str = None):
     model = get_embedding_model(model_path=model_path)
-    return model.encode(text).tolist()
+    return encode(model, text).tolist()
+
+def embed_query(model, query: str) -> np.ndarray:
+    """
+    Normalized embedding of a search query. Embeddings from the shared model returned by
+    get_embedding_model are cached by its name and the SHA-256 of the query text; other
+    models are not cached. The returned array is shared between callers and is read-only.
+    """
+    if model is not _model_instance or _model_name is None:
+        return np.asarray(encode(model, [query], show_progress_bar=False))[0]
+    key = (_model_name, hashlib.sha256(query.encode("utf-8")).hexdigest())
+    with _QUERY_EMBEDDING_CACHE_LOCK:
+        embedding = _QUERY_EMBEDDING_CACHE.get(key)
+    if embedding is None:
+        embedding = np.asarray(encode(model, [query], show_progress_bar=False))[0]
+        embedding.setflags(write=False)
+        with _QUERY_EMBEDDING_CACHE_LOCK:
+            _QUERY_EMBEDDING_CACHE[key] = embedding
+    return embedding
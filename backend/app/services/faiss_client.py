@@ -24,6 +24,21 @@ class FaissCollection:
         self.next_internal_id: int = 0
         self._load()
 
+    def _new_base_index(self):
+        """ Flat L2 index storing vectors at the precision set by settings.EMBED_DTYPE. """
+        if settings.EMBED_DTYPE == "float16":
+            # Half the memory and bandwidth per vector; fp16 needs no training step
+            return faiss.IndexScalarQuantizer(self.dimension, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_L2)
+        if settings.EMBED_DTYPE == "int8":
+            # A quarter of the memory and bandwidth per vector. Embeddings are L2-normalized, so every
+            # component lies in [-1, 1]; the quantizer is trained on that fixed range rather than on data.
+            index = faiss.IndexScalarQuantizer(self.dimension, faiss.ScalarQuantizer.QT_8bit_uniform, faiss.METRIC_L2)
+            unit_range = np.ones((2, self.dimension), dtype=np.float32)
+            unit_range[0] = -1.0
+            index.train(unit_range)
+            return index
+        return faiss.IndexFlatL2(self.dimension)
+
     def _load(self):
         """ Load index and metadata from disk. """
         loaded_index = False
@@ -46,8 +61,7 @@ class FaissCollection:
             # Only create a new index if the file does not exist
             logger.info(f"Index file {self.index_path} does not exist. Creating new FAISS index.")
             try:
-                base_index = faiss.IndexFlatL2(self.dimension)
-                self.index = faiss.IndexIDMap(base_index)
+                self.index = faiss.IndexIDMap(self._new_base_index())
                 loaded_index = True
             except Exception as e:
                 logger.error(f"Error creating new FAISS index for {self.name}: {e}")
@@ -72,10 +86,9 @@ class FaissCollection:
                      logger.warning("Metadata loading failed but index loaded. Index will be reset.")
                      self.index = None # Reset index too if metadata failed
         if self.index is None:
-            logger.info(f"Creating new FAISS index (IndexFlatL2 + IndexIDMap) for collection '{self.name}' with dimension {self.dimension}.")
+            logger.info(f"Creating new FAISS index ({settings.EMBED_DTYPE} + IndexIDMap) for collection '{self.name}' with dimension {self.dimension}.")
             try:
-                base_index = faiss.IndexFlatL2(self.dimension)
-                self.index = faiss.IndexIDMap(base_index)
+                self.index = faiss.IndexIDMap(self._new_base_index())
             except Exception as e:
                 logger.error(f"Error creating new FAISS index for {self.name} during fallback: {e}")
                 self.index = None
@@ -227,9 +240,9 @@ class FaissCollection:
             if doc_id:
                 final_ids.append(doc_id)
                 if 'distances' in include:
-                    # FAISS returns L2 squared, Chroma often uses cosine similarity or L2.
-                    # We'll return L2 distance.
-                    final_distances.append(float(np.sqrt(distances_list[j]))) # Ensure float
+                    # FAISS returns L2 squared. Embeddings are unit-normalized, so
+                    # L2^2 / 2 == 1 - <a, b>, matching Chroma's "ip" space distance.
+                    final_distances.append(float(distances_list[j]) / 2.0)
                 if 'metadatas' in include:
                     final_metadatas.append(self.metadata_store.get(doc_id, {}))
                 if 'documents' in include:
@@ -257,7 +270,13 @@ class FaissCollection:
         if not metadata:
             return False
         for key, value in where_clause.items():
-            if key not in metadata or metadata[key] != value:
+            if key not in metadata:
+                return False
+            if isinstance(value, dict) and '$in' in value:
+                # Chroma-style membership operator
+                if metadata[key] not in value['$in']:
+                    return False
+            elif metadata[key] != value:
                 return False
         return True
 
@@ -366,7 +385,7 @@ class FaissCollection:
         self.faiss_id_to_doc_id.clear()
         self.doc_id_to_faiss_id.clear()
         self.next_internal_id = 0
-        self.index = faiss.IndexIDMap(faiss.IndexFlatL2(self.dimension))
+        self.index = faiss.IndexIDMap(self._new_base_index())
         self._save()
         logger.info(f"FAISS collection '{self.name}' cleared (all records removed, index reset).")
 
@@ -393,7 +412,8 @@ class FaissClient:
             logger.warning(f"Falling back to default dimension: {dimension}")
             return dimension
 
-    def get_or_create_collection(self, name: str) -> FaissCollection:
+    def get_or_create_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None) -> FaissCollection:
+        # metadata (e.g. Chroma's "hnsw:space") is accepted for API compatibility and ignored
         if name in self.collections:
             return self.collections[name]
         else:
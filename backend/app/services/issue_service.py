@@ -1,16 +1,12 @@
-from typing import Optional, List, Dict, Any
-from app.services.chroma_client import get_collection
-from app.services.embedding_service import get_embedding_model
+from typing import Optional, List
+from app.services.chroma_client import get_collection, on_collection_invalidated
 from app.services.faiss_client import FaissCollection
-from app.utils.rag_utils import index_vector_data
-from app.utils.llm_augmentation import llm_summarize
 from app.models import IssueResponse
 from datetime import datetime
 import logging
 import os
-from app.utils.similarity import compute_text_similarity_score
+from app.utils.similarity import compute_text_similarity_scores
 from app.utils.rag_utils import load_components, create_bm25_index, create_retrievers, create_rag_pipeline
-from app.utils.dspy_utils import get_openrouter_llm
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +16,13 @@ COLLECTION_NAME = "issues"
 _rag_pipeline = None
 _corpus = None
 
+def _reset_rag_pipeline():
+    global _rag_pipeline, _corpus
+    _rag_pipeline = None
+    _corpus = None
+
+on_collection_invalidated(COLLECTION_NAME, _reset_rag_pipeline)
+
 def _get_rag_pipeline(use_llm: bool = False):
     global _rag_pipeline, _corpus
     if _rag_pipeline is not None:
@@ -58,6 +61,8 @@ def _get_rag_pipeline(use_llm: bool = False):
     # Use OpenRouter LLM via DSPy
     llm = None
     if use_llm:
+        # Imported here so importing the issue services does not load dspy
+        from app.utils.dspy_utils import get_openrouter_llm
         llm = get_openrouter_llm()
         if llm is None:
             raise RuntimeError("LLM could not be loaded but use_llm=True. Please check LLM configuration.")
@@ -67,6 +72,18 @@ def _get_rag_pipeline(use_llm: bool = False):
     _rag_pipeline = create_rag_pipeline(vector_retriever, bm25_retriever, reranker, llm)
     return _rag_pipeline
 
+def _msg_body(metadata: dict, document: str) -> str:
+    """
+    Return the MSG body for a stored issue. New records keep only its position within
+    the document; older records still carry the full msg_body in metadata.
+    """
+    if 'msg_body' in metadata:
+        return metadata['msg_body']
+    offset = metadata.get('msg_body_offset')
+    if offset is None or not document:
+        return ''
+    return document[offset:offset + metadata.get('msg_body_length', 0)]
+
 def delete_issue(issue_id: str) -> bool:
     try:
         collection = get_collection(COLLECTION_NAME)
@@ -77,19 +94,22 @@ def delete_issue(issue_id: str) -> bool:
         return False
 
 def get_issue(issue_id: str) -> Optional[IssueResponse]:
+    """
+    Fetch a single issue from the vector database, with its linked Jira ticket when it has one.
+    """
     try:
         collection = get_collection(COLLECTION_NAME)
-        result = collection.get(ids=[issue_id])
+        result = collection.get(ids=[issue_id], include=["metadatas", "documents"])
         if not result or not result['ids']:
             return None
         metadata = result['metadatas'][0]
         document = result['documents'][0]
         # Fetch Jira data if needed (optional)
         jira_data = None
+        if isinstance(metadata, list):
+            metadata = {}
         try:
             from app.services.jira_service import get_jira_ticket
-            if isinstance(metadata, list):
-                metadata = {}
             # FIX: Try both jira_ticket_id and msg_jira_id
             jira_ticket_id = metadata.get('jira_ticket_id') or metadata.get('msg_jira_id')
             if jira_ticket_id:
@@ -107,7 +127,7 @@ def get_issue(issue_id: str) -> Optional[IssueResponse]:
             updated_at=None,
             msg_data={
                 'subject': metadata.get('msg_subject', ''),
-                'body': metadata.get('msg_body', ''),
+                'body': _msg_body(metadata, document),
                 'sender': metadata.get('msg_sender', ''),
                 'received_date': metadata.get('msg_received_date', ''),
                 'jira_id': metadata.get('msg_jira_id', ''),
@@ -130,16 +150,11 @@ def search_similar_issues(query_text: str = "", jira_ticket_id: Optional[str] =
         # If searching by Jira ticket only, fallback to direct lookup
         if jira_ticket_id and not query_text:
             collection = get_collection(COLLECTION_NAME)
+            # jira_ticket_id is normalized to upper case at ingest time
             results = collection.get(
-                where={"$and": [
-                    {"$or": [
-                        {"jira_ticket_id": jira_ticket_id.upper()},
-                        {"jira_ticket_id": jira_ticket_id.lower()},
-                        {"msg_jira_id": jira_ticket_id.upper()},
-                        {"msg_jira_id": jira_ticket_id.lower()}
-                    ]}
-                ]},
+                where={"jira_ticket_id": jira_ticket_id.upper()},
                 limit=limit,
+                include=["metadatas", "documents"],
             )
             # Format as IssueResponse
             issue_responses = []
@@ -156,7 +171,7 @@ def search_similar_issues(query_text: str = "", jira_ticket_id: Optional[str] =
                     updated_at=None,
                     msg_data={
                         'subject': metadata.get('msg_subject', ''),
-                        'body': metadata.get('msg_body', ''),
+                        'body': _msg_body(metadata, document),
                         'sender': metadata.get('msg_sender', ''),
                         'received_date': metadata.get('msg_received_date', ''),
                         'jira_id': metadata.get('msg_jira_id', ''),
@@ -170,43 +185,54 @@ def search_similar_issues(query_text: str = "", jira_ticket_id: Optional[str] =
         rag_result = rag_pipeline.forward(query_text, use_llm=use_llm)
         responses = []
         retrieved_examples = rag_result.context
-        logger.debug(f"Issue RAG pipeline returned {len(retrieved_examples)} examples.")
+        # Checked once up front so the per-row debug strings are never built when DEBUG is off
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            logger.debug("Issue RAG pipeline returned %d examples.", len(retrieved_examples))
         # Filter out any results that are not from the Jira issues collection
         filtered_examples = [ex for ex in retrieved_examples if (ex.get('collection_name') == COLLECTION_NAME or ex.get('source') == 'jira') and not (ex.get('collection_name') == 'confluence_pages' or ex.get('source') == 'confluence')]
-        logger.debug(f"Filtered to {len(filtered_examples)} Jira-only examples.")
-        for idx, example in enumerate(retrieved_examples):
-            logger.debug(f"RAG example {idx} source: {example.get('source')}, collection: {example.get('collection_name')}, id: {example.get('id')}")
+        if debug_enabled:
+            logger.debug("Filtered to %d Jira-only examples.", len(filtered_examples))
+            for idx, example in enumerate(retrieved_examples):
+                logger.debug("RAG example %d source: %s, collection: %s, id: %s", idx, example.get('source'), example.get('collection_name'), example.get('id'))
         issue_ids = [ex.get('id') for ex in filtered_examples if ex.get('id')]
-        logger.debug(f"Extracted issue IDs from filtered RAG context: {issue_ids}")
+        if debug_enabled:
+            logger.debug("Extracted issue IDs from filtered RAG context: %s", issue_ids)
         issues_map = {}
         for issue_id in issue_ids:
             if not issue_id:
                 logger.warning("Skipping fetch for None/empty issue ID.")
                 continue
             try:
+                # The frontend links results through jira_data; repeat tickets come from get_jira_ticket's cache
                 issue = get_issue(issue_id)
                 if issue:
                     issues_map[issue_id] = issue
-                    logger.debug(f"Successfully fetched issue {issue_id} for map.")
+                    if debug_enabled:
+                        logger.debug("Successfully fetched issue %s for map.", issue_id)
                 else:
                     logger.warning(f"get_issue returned None for issue ID: {issue_id}")
             except Exception as fetch_err:
                  logger.error(f"Error fetching issue {issue_id} using get_issue: {fetch_err}")
-        logger.debug(f"Populated issues_map with {len(issues_map)} entries.")
+        if debug_enabled:
+            logger.debug("Populated issues_map with %d entries.", len(issues_map))
+        unscored = []
         for idx, example in enumerate(filtered_examples):
-            logger.debug(f"Processing filtered RAG example {idx}: {example}")
             if not hasattr(example, 'get'):
                 continue
             issue_id = example.get('id')
-            logger.debug(f"Extracted issue_id from example {idx}: {issue_id}") # Added debug log
+            if debug_enabled:
+                logger.debug("Processing filtered RAG example %d (issue_id=%s): %s", idx, issue_id, example)
 
             # Check if the issue was successfully fetched and exists in the map
             if issue_id and issue_id in issues_map:
                 issue = issues_map[issue_id]
-                logger.debug(f"Found issue {issue_id} in issues_map: {issue.model_dump_json(indent=2)}") # Added detailed log
-                # Add similarity score if available from RAG metadata
-                similarity_score = example.get('score') or compute_text_similarity_score(query_text, issue.description)
-                issue.similarity_score = similarity_score
+                if debug_enabled:
+                    logger.debug("Found issue %s in issues_map: %s", issue_id, issue.model_dump_json(indent=2))
+                # Add similarity score if available from RAG metadata; the rest are embedded in one batch below
+                issue.similarity_score = example.get('score')
+                if not issue.similarity_score:
+                    unscored.append(issue)
                 # Add LLM answer if it's the top result and available
                 if idx == 0 and rag_result.answer:
                     issue.llm_answer = rag_result.answer
@@ -214,6 +240,11 @@ def search_similar_issues(query_text: str = "", jira_ticket_id: Optional[str] =
             else:
                 logger.warning(f"Issue ID {issue_id} from RAG example {idx} not found in issues_map or was None.") # Added warning log
 
+        if unscored:
+            scores = compute_text_similarity_scores(query_text, [issue.description or "" for issue in unscored])
+            for issue, score in zip(unscored, scores):
+                issue.similarity_score = score
+
         # Sort by similarity score if available
         responses.sort(key=lambda x: x.similarity_score if x.similarity_score is not None else -1, reverse=True)
 
@@ -222,53 +253,3 @@ def search_similar_issues(query_text: str = "", jira_ticket_id: Optional[str] =
     except Exception as e:
         logger.error(f"Error in search_similar_issues: {str(e)}")
         raise
-
-def add_issue_to_vectordb(
-    issue: Dict[str, Any],
-    extra_metadata: Optional[Dict[str, Any]] = None,
-    llm_augment: Optional[Any] = None,
-    augment_metadata: bool = True,
-    normalize_language: bool = True,
-    target_language: str = "en"
-) -> Optional[str]:
-    """
-    Add an issue to the vector database with optional LLM-based augmentation and deduplication.
-    """
-    try:
-        client = get_collection(COLLECTION_NAME)._client
-        embedder = get_embedding_model()
-        issue_id = issue.get("id") or f"issue_{datetime.now().strftime('%Y%m%d%H%M%S')}"
-        title = issue.get("title", "")
-        description = issue.get("description", "")
-        document = f"{title}\n{description}".strip()
-        import hashlib
-        content_hash = hashlib.sha256(document.encode('utf-8')).hexdigest()
-        metadata = {
-            "msg_subject": title,
-            "msg_body": description,
-            "created_date": issue.get("created_at", str(datetime.now())),
-            "jira_ticket_id": issue.get("jira_ticket_id"),
-            "content_hash": content_hash,
-            "source": "jira",
-            "collection_name": COLLECTION_NAME
-        }
-        if extra_metadata:
-            metadata.update(extra_metadata)
-        index_vector_data(
-            client=client,
-            embedder=embedder,
-            documents=[document],
-            doc_ids=[issue_id],
-            collection_name=COLLECTION_NAME,
-            metadatas=[metadata],
-            clear_existing=False,
-            deduplicate=True,
-            llm_augment=llm_augment or llm_summarize,
-            augment_metadata=augment_metadata,
-            normalize_language=normalize_language,
-            target_language=target_language
-        )
-        return issue_id
-    except Exception as e:
-        logger.error(f"Error adding issue to vector database: {str(e)}")
-        return None
@@ -1,13 +1,21 @@
 from jira import JIRA
 from typing import Dict, Any, Optional
 import logging
+import threading
 from datetime import datetime
+from cachetools import TTLCache
 
 from app.core.config import settings
 from fastapi import HTTPException
 
 logger = logging.getLogger(__name__)
 
+# ticket id -> parsed ticket. The same ticket is often looked up several times in a row (issue
+# details, search results, re-ingest), so a short TTL saves those Jira round trips while still
+# picking up edits within a minute. Misses (None) are not cached.
+_TICKET_CACHE = TTLCache(maxsize=2048, ttl=60)
+_TICKET_CACHE_LOCK = threading.Lock()
+
 # Initialize Jira client
 def get_jira_client():
     """
@@ -153,8 +161,13 @@ def get_jira_ticket(ticket_id: str) -> Optional[Dict[str, Any]]:
         ticket_id: Jira ticket ID or key
         
     Returns:
-        Dictionary containing Jira ticket information or None if not found
+        Dictionary containing Jira ticket information or None if not found.
+        Results are cached for a short time and shared between callers, so treat them as read-only.
     """
+    with _TICKET_CACHE_LOCK:
+        cached = _TICKET_CACHE.get(ticket_id)
+    if cached is not None:
+        return cached
     try:
         jira = get_jira_client()
         if not jira:
@@ -219,6 +232,8 @@ def get_jira_ticket(ticket_id: str) -> Optional[Dict[str, Any]]:
 
         result["comments"] = comments_data
 
+        with _TICKET_CACHE_LOCK:
+            _TICKET_CACHE[ticket_id] = result
         return result
     
     except Exception as e:
@@ -249,18 +264,25 @@ def log_search_failure(error):
 
 from app.utils.rag_utils import load_components, index_vector_data, create_bm25_index, create_retrievers, create_rag_pipeline
 from app.services.embedding_service import get_embedding_model
-from app.services.chroma_client import get_vector_db_client
-from app.utils.llm_augmentation import llm_summarize
-from app.utils.dspy_utils import get_openrouter_llm
+from app.services.chroma_client import get_vector_db_client, on_collection_invalidated
 from app.services.rerank_service import get_reranker
 
 # Cache pipeline at module level to avoid reloading every call
 _rag_pipeline = None
 _corpus = None
 
+def _reset_rag_pipeline():
+    global _rag_pipeline, _corpus
+    _rag_pipeline = None
+    _corpus = None
+
+on_collection_invalidated(COLLECTION_NAME, _reset_rag_pipeline)
+
 def add_jira_ticket_to_vectordb(ticket_id: str, extra_metadata: Optional[Dict[str, Any]] = None, llm_augment: Optional[Any] = None, augment_metadata: bool = True, normalize_language: bool = True, target_language: str = "en") -> Optional[str]:
     log_ingest_start(ticket_id, extra_metadata)
     try:
+        # dspy is only needed once a ticket is actually ingested
+        from app.utils.llm_augmentation import llm_summarize
         jira_data = get_jira_ticket(ticket_id)
         if not jira_data:
             raise ValueError(f"Failed to fetch Jira ticket {ticket_id}")
@@ -319,6 +341,7 @@ def _get_rag_pipeline(use_llm: bool = False):
     # Use OpenRouter LLM via DSPy
     llm = None
     if use_llm:
+        from app.utils.dspy_utils import get_openrouter_llm
         llm = get_openrouter_llm()
     bm25_processor = create_bm25_index(_corpus)
     vector_retriever, bm25_retriever = create_retrievers(collection, embedder, bm25_processor, _corpus)
@@ -33,7 +33,9 @@ def generate_summary_from_results(results: list) -> str:
     # Take top N results (configurable, file-backed)
     top_results = results[:settings.LLM_TOP_RESULTS]
 
-    logger.info(f"Top results: {top_results}")
+    logger.info("Summarizing top %d of %d results", len(top_results), len(results))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Top results: %r", top_results)
 
     # Construct prompt
     prompt_context = "Based on the following top search results, please provide key action points:\n\n"
@@ -33,13 +33,20 @@ def log_search_failure(error):
 
 from app.utils.rag_utils import load_components, index_vector_data, create_bm25_index, create_retrievers, create_rag_pipeline
 from app.services.embedding_service import get_embedding_model
-from app.services.chroma_client import get_vector_db_client
+from app.services.chroma_client import get_vector_db_client, on_collection_invalidated
 from app.utils.llm_augmentation import llm_summarize
 from app.utils.dspy_utils import get_openrouter_llm
 
 _rag_pipeline = None
 _corpus = None
 
+def _reset_rag_pipeline():
+    global _rag_pipeline, _corpus
+    _rag_pipeline = None
+    _corpus = None
+
+on_collection_invalidated(COLLECTION_NAME, _reset_rag_pipeline)
+
 def add_msg_file_to_vectordb(file_path: str, extra_metadata: dict = None, llm_augment=None, augment_metadata=True, normalize_language=True, target_language="en") -> str:
     log_ingest_start(file_path, extra_metadata)
     try:
@@ -1,4 +1,3 @@
-from sentence_transformers import CrossEncoder
 from functools import lru_cache
 
 @lru_cache(maxsize=2)
@@ -6,4 +5,12 @@ def get_reranker(model_name=None):
     # You may customize this logic to use a default model from config if model_name is None
     if model_name is None:
         model_name = "cross-encoder/ms-marco-MiniLM-L-6-v2"
-    return CrossEncoder(model_name)
+    # Imported here so importing the services does not pull in torch until a reranker is needed
+    import torch
+    from sentence_transformers import CrossEncoder
+    reranker = CrossEncoder(model_name)
+    if torch.cuda.is_available():
+        # Reranking is compute-bound; half precision roughly doubles GPU throughput
+        reranker.model.half()
+    reranker.model.eval()
+    return reranker
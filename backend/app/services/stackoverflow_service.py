@@ -2,12 +2,12 @@ import logging
 import hashlib
 from typing import Optional, Dict, Any, List
 from datetime import datetime
-from app.services.chroma_client import get_vector_db_client
+from app.services.chroma_client import get_vector_db_client, on_collection_invalidated
 from app.services.embedding_service import get_embedding_model
 from app.services.rerank_service import get_reranker
 import re
 import requests
-from app.utils.similarity import compute_similarity_score, compute_text_similarity_score
+from app.utils.similarity import compute_text_similarity_scores
 from app.utils.rag_utils import load_components, create_bm25_index, create_retrievers, create_rag_pipeline, index_vector_data
 from app.utils.llm_augmentation import llm_summarize
 from app.models.models import StackOverflowQA
@@ -18,6 +18,8 @@ logger = logging.getLogger(__name__)
 
 COLLECTION_NAME = "stackoverflow_qa"
 
+_QUESTION_ID_RE = re.compile(r'/questions/(\d+)')
+
 # --- LOGGING INSTRUMENTATION START ---
 def log_ingest_start(url, extra_metadata):
     logger.info(f"[INGEST][START] Stack Overflow ingest called. URL: {url}, Extra metadata keys: {list(extra_metadata.keys()) if extra_metadata else None}")
@@ -48,6 +50,8 @@ def clear_stackoverflow_cache():
     _rag_pipeline = None
     _corpus = None
 
+on_collection_invalidated(COLLECTION_NAME, clear_stackoverflow_cache)
+
 def _get_rag_pipeline(use_llm: bool = False):
     global _rag_pipeline, _corpus
     if _rag_pipeline is not None:
@@ -76,7 +80,7 @@ def extract_question_id(stackoverflow_url: str) -> Optional[str]:
     Example: https://stackoverflow.com/questions/12345678/title-text
     """
     try:
-        match = re.search(r'/questions/(\d+)', stackoverflow_url)
+        match = _QUESTION_ID_RE.search(stackoverflow_url)
         if match:
             return match.group(1)
         else:
@@ -244,6 +248,8 @@ def search_similar_stackoverflow_content(query_text: str, limit: int = 10, use_l
         rag_result = rag_pipeline.forward(query_text,use_llm=use_llm)
         # Return as a list of dicts for frontend compatibility
         formatted = []
+        # Results without a retriever score are embedded together after the loop
+        pending_scores = []
         for idx, context in enumerate(rag_result.context):
             # Unwrap DSPy Example objects to dicts for frontend compatibility
             if hasattr(context, 'to_dict'):
@@ -258,7 +264,7 @@ def search_similar_stackoverflow_content(query_text: str, limit: int = 10, use_l
                     except Exception:
                         similarity_score = None
                 if similarity_score is None:
-                    similarity_score = compute_text_similarity_score(query_text, str(content))
+                    pending_scores.append((len(formatted), str(content)))
                 llm_answer = rag_result.answer if idx == 0 else None
                 metadata = {k: v for k, v in context_dict.items() if k not in ['long_text', 'id', 'item_id', 'title', 'similarity_score']}
                 question_id = context_dict.get('question_id') or metadata.get('question_id')
@@ -289,7 +295,7 @@ def search_similar_stackoverflow_content(query_text: str, limit: int = 10, use_l
                     except Exception:
                         similarity_score = None
                 if similarity_score is None:
-                    similarity_score = compute_text_similarity_score(query_text, str(content))
+                    pending_scores.append((len(formatted), str(content)))
                 llm_answer = rag_result.answer if idx == 0 else None
                 metadata = {k: v for k, v in context.items() if k not in ['content', 'text', 'id', 'item_id', 'title', 'similarity_score']}
                 question_id = context.get('question_id') or metadata.get('question_id')
@@ -320,7 +326,7 @@ def search_similar_stackoverflow_content(query_text: str, limit: int = 10, use_l
                     except Exception:
                         similarity_score = None
                 if similarity_score is None:
-                    similarity_score = compute_text_similarity_score(query_text, str(content))
+                    pending_scores.append((len(formatted), str(content)))
                 llm_answer = rag_result.answer if idx == 0 else None
                 metadata = {k: v for k, v in context.__dict__.items() if k not in ['long_text', 'id', 'item_id', 'title', 'similarity_score']}
                 question_id = getattr(context, 'question_id', None) or metadata.get('question_id')
@@ -342,16 +348,20 @@ def search_similar_stackoverflow_content(query_text: str, limit: int = 10, use_l
                 continue
             else:
                 content_str = str(context) if context else ""
-                similarity_score = compute_text_similarity_score(query_text, content_str)
+                pending_scores.append((len(formatted), content_str))
                 formatted.append({
                     'item_id': f"rag_{idx}",
                     'title': content_str[:150]+" ...",
                     'content': content_str,
-                    'similarity_score': similarity_score,
+                    'similarity_score': None,
                     'metadata': {},
                     'llm_answer': rag_result.answer if idx == 0 else None,
                     'url': '',
                 })
+        if pending_scores:
+            scores = compute_text_similarity_scores(query_text, [text for _, text in pending_scores])
+            for (pos, _), score in zip(pending_scores, scores):
+                formatted[pos]['similarity_score'] = score
         log_search_success(len(formatted))
         return formatted
     except Exception as e:
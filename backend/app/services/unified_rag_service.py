@@ -1,6 +1,6 @@
 import logging
 from typing import List, Dict, Any, Optional
-from app.services.chroma_client import get_vector_db_client
+from app.services.chroma_client import get_vector_db_client, on_collection_invalidated
 from app.services.embedding_service import get_embedding_model
 from app.utils.rag_utils import create_bm25_index, create_retrievers, create_rag_pipeline
 from app.utils.llm_augmentation import llm_summarize
@@ -37,6 +37,15 @@ def get_unified_corpus():
 _rag_pipeline = None
 _corpus = None
 
+def _reset_rag_pipeline():
+    global _rag_pipeline, _corpus
+    _rag_pipeline = None
+    _corpus = None
+
+# The unified pipeline is built over every collection in COLLECTIONS
+for _cname, _ in COLLECTIONS:
+    on_collection_invalidated(_cname, _reset_rag_pipeline)
+
 
 def _get_rag_pipeline(use_llm: bool = False):
     global _rag_pipeline, _corpus
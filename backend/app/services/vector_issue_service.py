@@ -1,10 +1,13 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple, Union
 from datetime import datetime, date
 import os
 import logging
+import time
+import queue
+import threading
 
 from app.services.chroma_client import get_collection
-from app.services.embedding_service import get_embedding
+from app.services.embedding_service import get_embedding, get_embedding_model, encode
 from app.services.deduplication_utils import compute_content_hash
 from app.core.config import settings
 
@@ -27,6 +30,167 @@ def log_ingest_failure(error):
 
 # --- LOGGING INSTRUMENTATION END ---
 
+# Background ingest (settings.ASYNC_INGEST): records are queued as (issue_id, full_text, metadata)
+# and a single worker thread embeds them in batches and adds them to the collection.
+_INGEST_Q = queue.Queue()
+_ingest_worker_thread = None
+_ingest_worker_lock = threading.Lock()
+# content_hash -> issue_id for records queued but not yet written, so duplicates are still caught
+_pending_hashes = {}
+
+def _ingest_worker():
+    while True:
+        batch = [_INGEST_Q.get()]
+        while len(batch) < settings.EMBED_BATCH:
+            try:
+                batch.append(_INGEST_Q.get(timeout=0.02))
+            except queue.Empty:
+                break
+        ids = [item[0] for item in batch]
+        texts = [item[1] for item in batch]
+        metadatas = [item[2] for item in batch]
+        try:
+            model = get_embedding_model()
+            embeddings = encode(model, texts, batch_size=settings.EMBED_BATCH).tolist()
+            get_collection(COLLECTION_NAME).add(
+                ids=ids,
+                embeddings=embeddings,
+                metadatas=metadatas,
+                documents=texts
+            )
+            for issue_id in ids:
+                log_ingest_success(issue_id)
+        except Exception as e:
+            log_ingest_failure(e)
+            logger.error(f"Error adding queued issues {ids} to vector database: {str(e)}")
+        finally:
+            with _ingest_worker_lock:
+                for metadata in metadatas:
+                    _pending_hashes.pop(metadata.get("content_hash"), None)
+            for _ in batch:
+                _INGEST_Q.task_done()
+
+def _enqueue_ingest(issue_id: str, full_text: str, metadata: Dict[str, Any]):
+    global _ingest_worker_thread
+    with _ingest_worker_lock:
+        if _ingest_worker_thread is None or not _ingest_worker_thread.is_alive():
+            _ingest_worker_thread = threading.Thread(target=_ingest_worker, name="issue-ingest", daemon=True)
+            _ingest_worker_thread.start()
+        _pending_hashes[metadata["content_hash"]] = issue_id
+    _INGEST_Q.put((issue_id, full_text, metadata))
+
+def _build_issue_record(issue: Dict[str, Any], now_ts: float) -> Tuple[str, str, Dict[str, Any]]:
+    """
+    Validate an issue and build its (issue_id, full_text, metadata) record.
+    metadata["content_hash"] is the deduplication key.
+    """
+    if not issue:
+        raise ValueError("Issue data must be provided")
+
+    msg_data = issue.get("msg_data", {})
+    jira_data = issue.get("jira_data", {})
+    if not msg_data and not jira_data:
+        raise ValueError("Either MSG data or Jira data must be provided")
+
+    msg_subject = msg_data.get("subject", "")
+    msg_body = msg_data.get("body", "")
+    jira_ticket_id = jira_data.get("key") if jira_data else None
+    jira_summary = jira_data.get("summary", "")
+    jira_description = jira_data.get("description", "") or ""
+
+    # Deduplication hash
+    if msg_data:
+        content_hash = compute_content_hash(msg_subject or "", msg_body or "")
+    elif jira_data:
+        content_hash = compute_content_hash(jira_summary or "", jira_description or "", jira_ticket_id or "")
+    else:
+        content_hash = ""
+
+    id_stamp = time.strftime('%Y%m%d%H%M%S', time.localtime(now_ts))
+    if msg_data:
+        file_path = msg_data.get('file_path', '')
+        suffix = os.path.basename(file_path) if file_path else 'no_msgfile'
+    elif jira_data:
+        suffix = jira_ticket_id or 'no_jiraid'
+    else:
+        suffix = 'unknown'
+    issue_id = f"issue_{id_stamp}_{suffix}"
+
+    # Jira comments
+    jira_comments_text = ""
+    if jira_data:
+        comments = jira_data.get("comments", [])
+        if isinstance(comments, str):
+            comments = [comments]
+        elif not isinstance(comments, list):
+            comments = []
+        if comments:
+            formatted_comments = []
+            for comment in comments:
+                if isinstance(comment, dict):
+                    author_field = comment.get("author", "Unknown Author")
+                    if isinstance(author_field, dict):
+                        author = author_field.get("displayName", "Unknown Author")
+                    else:
+                        author = author_field
+                    body = comment.get("body", "")
+                    formatted_comments.append(f"{author}: {body}")
+                else:
+                    formatted_comments.append(str(comment))
+            jira_comments_text = "\n".join(formatted_comments)
+
+    # Prepare full text for embedding: non-empty sections joined by newlines
+    base_parts = [msg_subject, msg_body, jira_summary, jira_description]
+    # Ensure Jira ticket ID is present in the embedding text if available
+    ticket_part = jira_ticket_id if jira_ticket_id and not any(jira_ticket_id in p for p in base_parts if p) else ""
+    # Comments go first for higher weight in semantic search
+    comments_part = f"Comments:\n{jira_comments_text}" if jira_comments_text else ""
+    sections = [comments_part, ticket_part] + base_parts
+    full_text = "\n".join(p for p in sections if p)
+    if not full_text.strip():
+        raise ValueError("No content to embed")
+    # The body is not duplicated into metadata; record where it sits in the document instead
+    msg_body_offset = sum(len(p) + 1 for p in sections[:3] if p)
+
+    metadata = {
+        "msg_subject": msg_subject,
+        "msg_body_offset": msg_body_offset,
+        "msg_body_length": len(msg_body),
+        "msg_sender": msg_data.get("sender", "") if msg_data else "",
+        "msg_received_date": "",
+        "msg_jira_id": msg_data.get("jira_id", "") if msg_data else "",
+        "msg_jira_url": msg_data.get("jira_url", "") if msg_data else "",
+        "recipients": msg_data.get("recipients", []) if msg_data else [],
+        # Stored upper-cased (falling back to the Jira ID found in the MSG) so lookups
+        # by ticket ID are a single equality predicate on one field.
+        "jira_ticket_id": (jira_ticket_id or (msg_data.get("jira_id") if msg_data else "") or "").upper(),
+        "jira_summary": jira_summary,
+        "created_date": datetime.fromtimestamp(now_ts).isoformat() if not (msg_data and msg_data.get("received_date")) else "",
+        "content_hash": content_hash,
+        "source": "jira",
+        "collection_name": COLLECTION_NAME
+    }
+    # Safely assign msg_received_date
+    received_date = msg_data.get("received_date", None) if msg_data else None
+    if received_date:
+        if isinstance(received_date, (datetime, date)):
+            metadata["msg_received_date"] = received_date.isoformat()
+        elif isinstance(received_date, str):
+            metadata["msg_received_date"] = received_date
+        else:
+            metadata["msg_received_date"] = str(received_date)
+    # Sanitize metadata
+    sanitized_metadata = {}
+    for k, v in metadata.items():
+        if v is None:
+            sanitized_metadata[k] = ""
+        elif isinstance(v, list):
+            sanitized_metadata[k] = ", ".join(str(item) for item in v)
+        else:
+            sanitized_metadata[k] = v
+    metadata = sanitized_metadata
+    return issue_id, full_text, metadata
+
 def add_issue_to_vectordb(
     issue: Dict[str, Any],
     extra_metadata: Optional[Dict[str, Any]] = None,
@@ -37,74 +201,24 @@ def add_issue_to_vectordb(
 ) -> Optional[str]:
     log_ingest_start(issue, extra_metadata)
     try:
-        if not issue:
-            raise ValueError("Issue data must be provided")
-
-        msg_data = issue.get("msg_data", {})
-        jira_data = issue.get("jira_data", {})
-        if not msg_data and not jira_data:
-            raise ValueError("Either MSG data or Jira data must be provided")
-
-        msg_subject = msg_data.get("subject", "")
-        msg_body = msg_data.get("body", "")
-        jira_ticket_id = jira_data.get("key") if jira_data else None
-        jira_summary = jira_data.get("summary", "")
-        jira_description = jira_data.get("description", "") or ""
-
-        # Deduplication hash
-        if msg_data:
-            content_hash = compute_content_hash(msg_subject or "", msg_body or "")
-        elif jira_data:
-            content_hash = compute_content_hash(jira_summary or "", jira_description or "", jira_ticket_id or "")
-        else:
-            content_hash = ""
+        # The clock is read once; the id stamp and the ISO date are both derived from it
+        issue_id, full_text, metadata = _build_issue_record(issue, time.time())
+        content_hash = metadata["content_hash"]
 
         collection = get_collection(COLLECTION_NAME)
         existing = collection.get(where={"content_hash": content_hash})
         if existing and existing.get("ids"):
             return existing["ids"][0]
+        # The background worker removes hashes as it writes them
+        with _ingest_worker_lock:
+            pending_id = _pending_hashes.get(content_hash)
+        if pending_id:
+            return pending_id
+
+        if settings.ASYNC_INGEST:
+            _enqueue_ingest(issue_id, full_text, metadata)
+            return issue_id
 
-        if msg_data:
-            file_path = msg_data.get('file_path', '')
-            suffix = os.path.basename(file_path) if file_path else 'no_msgfile'
-            issue_id = f"issue_{datetime.now().strftime('%Y%m%d%H%M%S')}_{suffix}"
-        elif jira_data:
-            suffix = jira_ticket_id or 'no_jiraid'
-            issue_id = f"issue_{datetime.now().strftime('%Y%m%d%H%M%S')}_{suffix}"
-        else:
-            issue_id = f"issue_{datetime.now().strftime('%Y%m%d%H%M%S')}_unknown"
-
-        # Jira comments
-        jira_comments_text = ""
-        if jira_data:
-            comments = jira_data.get("comments", [])
-            if isinstance(comments, str):
-                comments = [comments]
-            elif not isinstance(comments, list):
-                comments = []
-            if comments:
-                formatted_comments = []
-                for comment in comments:
-                    if isinstance(comment, dict):
-                        author_field = comment.get("author", "Unknown Author")
-                        if isinstance(author_field, dict):
-                            author = author_field.get("displayName", "Unknown Author")
-                        else:
-                            author = author_field
-                        body = comment.get("body", "")
-                        formatted_comments.append(f"{author}: {body}")
-                    else:
-                        formatted_comments.append(str(comment))
-                jira_comments_text = "\n".join(formatted_comments)
-
-        # Prepare full text for embedding
-        # Ensure Jira ticket ID is present in the embedding text if available
-        full_text = f"{msg_subject}\n{msg_body}\n{jira_summary}\n{jira_description}"
-        if jira_ticket_id and jira_ticket_id not in full_text:
-            full_text = f"{jira_ticket_id}\n" + full_text
-        if jira_comments_text:
-            # Prepend comments to the embedding text for higher weight in semantic search
-            full_text = f"Comments:\n{jira_comments_text}\n" + full_text
         # Only pass model_path if set in env
         if getattr(settings, "MODEL_LOCAL_PATH", None):
             logger.info(f"Using local model: {settings.MODEL_LOCAL_PATH}")
@@ -113,41 +227,6 @@ def add_issue_to_vectordb(
             logger.info(f"Using model: {settings.EMBEDDING_MODEL}")
             embedding = get_embedding(full_text)
 
-        metadata = {
-            "msg_subject": msg_subject,
-            "msg_body": msg_body,
-            "msg_sender": msg_data.get("sender", "") if msg_data else "",
-            "msg_received_date": "",
-            "msg_jira_id": msg_data.get("jira_id", "") if msg_data else "",
-            "msg_jira_url": msg_data.get("jira_url", "") if msg_data else "",
-            "recipients": msg_data.get("recipients", []) if msg_data else [],
-            "jira_ticket_id": jira_ticket_id or "",
-            "jira_summary": jira_summary,
-            "created_date": datetime.now().isoformat() if not (msg_data and msg_data.get("received_date")) else "",
-            "content_hash": content_hash,
-            "source": "jira",
-            "collection_name": COLLECTION_NAME
-        }
-        # Safely assign msg_received_date
-        received_date = msg_data.get("received_date", None) if msg_data else None
-        if received_date:
-            if isinstance(received_date, (datetime, date)):
-                metadata["msg_received_date"] = received_date.isoformat()
-            elif isinstance(received_date, str):
-                metadata["msg_received_date"] = received_date
-            else:
-                metadata["msg_received_date"] = str(received_date)
-        # Sanitize metadata
-        sanitized_metadata = {}
-        for k, v in metadata.items():
-            if v is None:
-                sanitized_metadata[k] = ""
-            elif isinstance(v, list):
-                sanitized_metadata[k] = ", ".join(str(item) for item in v)
-            else:
-                sanitized_metadata[k] = v
-        metadata = sanitized_metadata
-
         collection.add(
             ids=[issue_id],
             embeddings=[embedding],
@@ -161,22 +240,76 @@ def add_issue_to_vectordb(
         logger.error(f"Error adding issue to vector database: {str(e)}")
         raise
 
-def add_issue_to_vectordb_wrapper(
-    issue: Dict[str, Any],
+def add_issues_to_vectordb(
+    issues: List[Dict[str, Any]],
     extra_metadata: Optional[Dict[str, Any]] = None,
     llm_augment: Optional[Any] = None,
     augment_metadata: bool = True,
     normalize_language: bool = True,
     target_language: str = "en"
-) -> Optional[str]:
+) -> List[Union[str, Exception]]:
     """
-    Wrapper to call the new add_issue_to_vectordb with augmentation options.
+    Ingest several issues with a single embedding pass and a single collection.add.
+    Returns, in input order, the issue ID of each issue (the existing ID for duplicates),
+    or the exception raised for an issue that could not be built.
     """
-    return add_issue_to_vectordb(
-        issue=issue,
-        extra_metadata=extra_metadata,
-        llm_augment=llm_augment,
-        augment_metadata=augment_metadata,
-        normalize_language=normalize_language,
-        target_language=target_language
-    )
+    now_ts = time.time()
+    # content_hash -> (issue_id, full_text, metadata); duplicates within the batch collapse onto one record
+    records = {}
+    # Per input: its content_hash, or the exception that kept it from being built
+    hashes = []
+    for issue in issues:
+        log_ingest_start(issue, extra_metadata)
+        try:
+            issue_id, full_text, metadata = _build_issue_record(issue, now_ts)
+        except Exception as e:
+            log_ingest_failure(e)
+            hashes.append(e)
+            continue
+        content_hash = metadata["content_hash"]
+        if content_hash not in records:
+            # Issues sharing a file name or ticket key in the same second would otherwise share an ID
+            if any(record[0] == issue_id for record in records.values()):
+                issue_id = f"{issue_id}_{len(records)}"
+            records[content_hash] = (issue_id, full_text, metadata)
+        hashes.append(content_hash)
+    if not records:
+        return hashes
+
+    try:
+        collection = get_collection(COLLECTION_NAME)
+        existing = collection.get(where={"content_hash": {"$in": list(records)}}, include=["metadatas"])
+        ids_by_hash = {}
+        if existing and existing.get("ids"):
+            for existing_id, existing_metadata in zip(existing["ids"], existing.get("metadatas") or []):
+                ids_by_hash.setdefault((existing_metadata or {}).get("content_hash"), existing_id)
+        with _ingest_worker_lock:
+            for content_hash in records:
+                if content_hash not in ids_by_hash and content_hash in _pending_hashes:
+                    ids_by_hash[content_hash] = _pending_hashes[content_hash]
+        new_records = [record for content_hash, record in records.items() if content_hash not in ids_by_hash]
+
+        if new_records and settings.ASYNC_INGEST:
+            for record in new_records:
+                _enqueue_ingest(*record)
+        elif new_records:
+            ids = [record[0] for record in new_records]
+            texts = [record[1] for record in new_records]
+            model = get_embedding_model(model_path=settings.MODEL_LOCAL_PATH)
+            embeddings = encode(model, texts, batch_size=settings.EMBED_BATCH).tolist()
+            collection.add(
+                ids=ids,
+                embeddings=embeddings,
+                metadatas=[record[2] for record in new_records],
+                documents=texts
+            )
+            for issue_id in ids:
+                log_ingest_success(issue_id)
+    except Exception as e:
+        log_ingest_failure(e)
+        logger.error(f"Error adding issues to vector database: {str(e)}")
+        raise
+
+    for content_hash, record in records.items():
+        ids_by_hash.setdefault(content_hash, record[0])
+    return [ids_by_hash[content_hash] if isinstance(content_hash, str) else content_hash for content_hash in hashes]
@@ -1,8 +1,9 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 import logging
 from app.models import IssueResponse
 from app.services.chroma_client import get_vector_db_client
 from app.services.vector_issue_service import add_issue_to_vectordb as original_add_issue_to_vectordb
+from app.services.vector_issue_service import add_issues_to_vectordb as original_add_issues_to_vectordb
 from app.services.issue_service import delete_issue as real_delete_issue, get_issue as real_get_issue
 from app.services.chroma_client import clear_collection as real_clear_collection
 from app.services.issue_service import search_similar_issues as real_search_similar_issues
@@ -20,7 +21,9 @@ def get_all_chroma_collections_data() -> list:
     try:
         client = get_vector_db_client()
         collections = client.list_collections()
-        logger.info(f"ChromaDB list_collections() returned: {collections}")
+        logger.info("ChromaDB list_collections() returned %d collections", len(collections))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("ChromaDB list_collections() returned: %r", collections)
         all_data = []
         for col in collections:
             # Ensure col is a string (collection name), not a Collection object
@@ -76,6 +79,26 @@ def add_issue_to_vectordb(msg_data: Optional[Dict[str, Any]] = None, jira_data:
         target_language=target_language
     )
 
+def add_issues_to_vectordb(msg_data_list: Optional[List[Dict[str, Any]]] = None,
+                           jira_data_list: Optional[List[Dict[str, Any]]] = None,
+                           augment_metadata: bool = True, normalize_language: bool = True,
+                           target_language: str = "en") -> List[Union[str, Exception]]:
+    """
+    Batch counterpart of add_issue_to_vectordb: the issues are embedded in one pass and added
+    in one write. Returns, per input with MSG issues first, its issue ID or the exception
+    that kept it from being ingested.
+    """
+    issues = [{"msg_data": msg_data} for msg_data in msg_data_list or []]
+    issues += [{"jira_data": jira_data} for jira_data in jira_data_list or []]
+    if not issues:
+        return []
+    return original_add_issues_to_vectordb(
+        issues,
+        augment_metadata=augment_metadata,
+        normalize_language=normalize_language,
+        target_language=target_language
+    )
+
 # Defensive patch: avoid infinite recursion by calling the real implementation
 def delete_issue(issue_id: str) -> bool:
     """
@@ -1,12 +1,25 @@
-from typing import List
-from rank_bm25 import BM25Okapi
+from typing import List, Optional, Tuple
+import bm25s
+import numpy as np
 import nltk
 import os
-from nltk.corpus import stopwords
+import hashlib
+import logging
+import shutil
+from functools import lru_cache
 from nltk.tokenize import word_tokenize
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Set once the NLTK data has been located, so later calls skip the nltk.data.find lookups
+_READY = False
 
 def ensure_nltk_resources():
-    """Ensure required NLTK resources are downloaded."""
+    """Ensure required NLTK resources are downloaded. Idempotent and cheap after the first call."""
+    global _READY
+    if _READY:
+        return
     # Get absolute path to .venv/nltk_data relative to this file
     nltk_data_dir = os.path.abspath(
         os.path.join(os.path.dirname(__file__), '..', '..', '.venv', 'nltk_data')
@@ -23,6 +36,7 @@ def ensure_nltk_resources():
         nltk.download('punkt', download_dir=nltk_data_dir)
         nltk.download('punkt_tab', download_dir=nltk_data_dir)
         nltk.download('stopwords', download_dir=nltk_data_dir)
+    _READY = True
 
 # Robust stopwords loader
 def get_english_stopwords():
@@ -44,22 +58,127 @@ def get_english_stopwords():
         nltk.download('stopwords', download_dir=nltk_data_dir)
         return set(stopwords.words('english'))
 
+_STOPWORDS: frozenset = frozenset()
+
+def _load_stopwords() -> frozenset:
+    global _STOPWORDS
+    if not _STOPWORDS:
+        _STOPWORDS = frozenset(get_english_stopwords())
+    return _STOPWORDS
+
+@lru_cache(maxsize=4096)
+def _tokenize(text: str) -> Tuple[str, ...]:
+    """Lower-cased alphanumeric NLTK tokens of text with English stopwords removed."""
+    stop_words = _STOPWORDS or _load_stopwords()
+    return tuple(
+        word.lower() for word in word_tokenize(text)
+        if word.isalnum() and word.lower() not in stop_words
+    )
+
+# Saved indexes kept under BM25_INDEX_PATH, most recently used first. Every collection saves its
+# own, so this must exceed the number of collections; older corpora's indexes are deleted.
+_KEEP_INDEXES = 8
+
+def _corpus_fingerprint(documents: List[str]) -> str:
+    digest = hashlib.sha256()
+    for doc in documents:
+        digest.update(doc.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()[:32]
+
 class BM25Processor:
+    """
+    BM25 keyword index backed by bm25s, which precomputes a sparse doc-term score
+    matrix at index time so queries are a sparse lookup instead of a Python loop.
+    With numba installed (settings.BM25_BACKEND) scoring and top-k selection run
+    in JIT-compiled kernels.
+    Indexes are saved under settings.BM25_INDEX_PATH keyed by a fingerprint of the
+    corpus, so a restart over an unchanged corpus memory-maps the saved index instead
+    of re-tokenizing every document. Only the _KEEP_INDEXES most recently used
+    saved indexes are kept.
+    """
     def __init__(self, documents: List[str]):
         ensure_nltk_resources()
-        stop_words = get_english_stopwords()
-        self.tokenized_docs = [
-            [word.lower() for word in word_tokenize(doc) if word.isalnum() and word.lower() not in stop_words]
-            for doc in documents
-        ]
-        self.bm25 = BM25Okapi(self.tokenized_docs)
+        _load_stopwords()
+        # Bound the token cache to the current corpus
+        _tokenize.cache_clear()
         self.documents = documents
+        index_dir = self._index_dir(documents)
+        self.bm25 = self._load(index_dir) if index_dir else None
+        if self.bm25 is None:
+            self.bm25 = bm25s.BM25(backend=settings.BM25_BACKEND)
+            self.bm25.index([list(_tokenize(doc)) for doc in documents], show_progress=False)
+            if index_dir:
+                self._save(index_dir)
+        # Term -> integer id of the indexed vocabulary; queries are mapped through it once
+        self._vocab = self.bm25.vocab_dict
 
-    def get_scores(self, query: str) -> List[float]:
-        ensure_nltk_resources()
-        stop_words = get_english_stopwords()
-        tokenized_query = [
-            word.lower() for word in word_tokenize(query)
-            if word.isalnum() and word.lower() not in stop_words
-        ]
-        return self.bm25.get_scores(tokenized_query)
\ No newline at end of file
+    @staticmethod
+    def _index_dir(documents: List[str]) -> Optional[str]:
+        if not settings.BM25_INDEX_PATH:
+            return None
+        return os.path.join(settings.BM25_INDEX_PATH, _corpus_fingerprint(documents))
+
+    @staticmethod
+    def _load(index_dir: str) -> Optional[bm25s.BM25]:
+        if not os.path.isdir(index_dir):
+            return None
+        try:
+            bm25 = bm25s.BM25.load(index_dir, mmap=True)
+            # Mark the index as recently used so pruning keeps it
+            os.utime(index_dir)
+            return bm25
+        except Exception as e:
+            logger.warning(f"Could not load BM25 index from {index_dir}, rebuilding: {e}")
+            return None
+
+    def _save(self, index_dir: str):
+        # Write to a temporary directory first so a concurrent reader never sees a partial index
+        tmp_dir = f"{index_dir}.tmp{os.getpid()}"
+        try:
+            self.bm25.save(tmp_dir)
+            os.replace(tmp_dir, index_dir)
+        except Exception as e:
+            logger.warning(f"Could not save BM25 index to {index_dir}: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        self._prune(os.path.dirname(index_dir))
+
+    @staticmethod
+    def _prune(index_root: str):
+        """Delete all but the _KEEP_INDEXES most recently used saved indexes."""
+        try:
+            # Only fingerprint directories; in-progress .tmp directories of other processes are left alone
+            index_dirs = [entry for entry in os.scandir(index_root) if entry.is_dir() and '.' not in entry.name]
+            index_dirs.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        except OSError as e:
+            logger.warning(f"Could not list BM25 indexes in {index_root}: {e}")
+            return
+        for entry in index_dirs[_KEEP_INDEXES:]:
+            logger.info(f"Removing stale BM25 index {entry.path}")
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+    def _query_token_ids(self, query: str) -> List[int]:
+        """Vocabulary ids of the query terms; terms absent from the corpus are dropped."""
+        vocab = self._vocab
+        return [vocab[token] for token in _tokenize(query) if token in vocab]
+
+    def get_scores(self, query: str) -> np.ndarray:
+        token_ids = self._query_token_ids(query)
+        if not token_ids:
+            return np.zeros(len(self.documents), dtype=np.float32)
+        return self.bm25.get_scores(token_ids)
+
+    def get_top_k(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """Return up to k (document index, score) pairs with a positive score, best first."""
+        token_ids = self._query_token_ids(query)
+        k = min(k, len(self.documents))
+        # A query sharing no terms with the corpus cannot score above zero
+        if not token_ids or k <= 0:
+            return []
+        scores = np.asarray(self.bm25.get_scores(token_ids), dtype=np.float32)
+        # Select the top k with np.argpartition and sort only those k
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        top = top[scores[top] > 0]
+        return list(zip(top.tolist(), scores[top].tolist()))
\ No newline at end of file
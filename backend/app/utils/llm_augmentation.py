@@ -1,8 +1,25 @@
 import dspy
+import hashlib
 import json
-from typing import Optional, Dict, Any
+import logging
+import threading
+from functools import lru_cache
+from cachetools import LRUCache
+from typing import Optional, Dict, Any, List, Callable, Tuple
+from app.core.config import settings
 from app.utils.dspy_utils import get_openrouter_llm
 
+logger = logging.getLogger(__name__)
+
+# Caps in-flight LLM requests across all threads (batched ingest, concurrent API requests)
+# so parallel fan-out stays under the provider's rate limit
+_LLM_SEMAPHORE = threading.BoundedSemaphore(settings.LLM_NUM_THREADS)
+
+# Augmentation results keyed by (content hash, model, options), so re-ingesting a document
+# (retries, re-indexes, duplicates) does not repeat its LLM calls
+_AUGMENT_CACHE = LRUCache(maxsize=8192)
+_AUGMENT_CACHE_LOCK = threading.Lock()
+
 # Define DSPy Signatures
 class SummarizeSignature(dspy.Signature):
     """Summarize the text for improved retrieval and semantic search."""
@@ -21,15 +38,32 @@ class NormalizeLanguageSignature(dspy.Signature):
     target_language = dspy.InputField(desc="The target language code (e.g., 'en', 'es').")
     normalized_text = dspy.OutputField(desc="The text normalized to the target language.")
 
+@lru_cache(maxsize=32)
+def _get_predictor(signature, max_tokens=None) -> dspy.Predict:
+    """Build the dspy.Predict for a signature and token budget once and reuse it."""
+    return dspy.Predict(signature, max_tokens=max_tokens) if max_tokens else dspy.Predict(signature)
+
+
+def _token_bucket(n: int) -> int:
+    """Round a token budget up to the next power of two so variable budgets share predictors."""
+    return 1 << max(n - 1, 0).bit_length()
+
+
 # Refactored Functions using dspy.Predict
 def llm_predict_with_signature(signature, input_kwargs, llm=None, max_tokens=None):
     """
     Generic utility to call a DSPy predictor with a given signature and input kwargs.
+    Without an explicit llm, an LM already bound by an enclosing dspy.context (e.g. the
+    batched ingest program) is reused instead of building and binding a new one.
     """
+    predictor = _get_predictor(signature, max_tokens)
+    outer_lm = dspy.settings.lm
+    if (llm is None and outer_lm is not None) or (llm is not None and llm is outer_lm):
+        with _LLM_SEMAPHORE:
+            return predictor(**input_kwargs)
     if llm is None:
         llm = get_openrouter_llm()
-    with dspy.context(lm=llm):
-        predictor = dspy.Predict(signature, max_tokens=max_tokens) if max_tokens else dspy.Predict(signature)
+    with dspy.context(lm=llm), _LLM_SEMAPHORE:
         return predictor(**input_kwargs)
 
 
@@ -39,19 +73,23 @@ def llm_summarize(text: str, llm: Optional[dspy.LM] = None) -> str:
     return result.summary
 
 
-def llm_extract_metadata(text: str, llm: Optional[dspy.LM] = None) -> Dict[str, Any]:
-    """Extract structured metadata from text using dspy.Predict."""
-    result = llm_predict_with_signature(ExtractMetadataSignature, {'text': text}, llm=llm, max_tokens=200)
+def _parse_metadata_json(metadata_json: str) -> Dict[str, Any]:
     try:
-        metadata = json.loads(result.metadata_json.strip())
+        metadata = json.loads(metadata_json.strip())
         if isinstance(metadata, dict):
             return metadata
         else:
-            return {"raw": result.metadata_json.strip()}
+            return {"raw": metadata_json.strip()}
     except json.JSONDecodeError:
-        return {"raw": result.metadata_json.strip()}
+        return {"raw": metadata_json.strip()}
     except Exception:
-        return {"raw": result.metadata_json.strip()}
+        return {"raw": metadata_json.strip()}
+
+
+def llm_extract_metadata(text: str, llm: Optional[dspy.LM] = None) -> Dict[str, Any]:
+    """Extract structured metadata from text using dspy.Predict."""
+    result = llm_predict_with_signature(ExtractMetadataSignature, {'text': text}, llm=llm, max_tokens=200)
+    return _parse_metadata_json(result.metadata_json)
 
 
 def llm_normalize_language(text: str, target_language: str = "en", llm: Optional[dspy.LM] = None) -> str:
@@ -60,6 +98,87 @@ def llm_normalize_language(text: str, target_language: str = "en", llm: Optional
         NormalizeLanguageSignature,
         {'text': text, 'target_language': target_language},
         llm=llm,
-        max_tokens=len(text) + 50
+        max_tokens=_token_bucket(len(text) + 50)
     )
     return result.normalized_text
+
+
+class IngestAugmentation(dspy.Module):
+    """
+    The per-document ingest augmentation chain as one DSPy program:
+    normalize language -> summarize -> extract metadata.
+    A custom summarize_fn replaces the built-in summarization step.
+    """
+    def __init__(self, normalize_language: bool = True, augment_metadata: bool = True,
+                 summarize_fn: Optional[Callable[[str], str]] = None):
+        super().__init__()
+        self.normalize_language = normalize_language
+        self.augment_metadata = augment_metadata
+        self.summarize_fn = summarize_fn
+        self.normalize = dspy.Predict(NormalizeLanguageSignature)
+        self.summarize = dspy.Predict(SummarizeSignature)
+        self.extract = dspy.Predict(ExtractMetadataSignature)
+
+    def forward(self, text: str, target_language: str = "en"):
+        if self.normalize_language:
+            with _LLM_SEMAPHORE:
+                text = self.normalize(text=text, target_language=target_language, config={"max_tokens": len(text) + 50}).normalized_text
+        if self.summarize_fn:
+            # Custom callables (e.g. llm_summarize) acquire the semaphore themselves
+            text = self.summarize_fn(text)
+        else:
+            with _LLM_SEMAPHORE:
+                text = self.summarize(text=text, config={"max_tokens": 150}).summary
+        metadata = {}
+        if self.augment_metadata:
+            with _LLM_SEMAPHORE:
+                metadata = _parse_metadata_json(self.extract(text=text, config={"max_tokens": 200}).metadata_json)
+        return dspy.Prediction(text=text, metadata=metadata)
+
+
+def llm_augment_documents(
+    documents: List[str],
+    target_language: str = "en",
+    normalize_language: bool = True,
+    augment_metadata: bool = True,
+    summarize_fn: Optional[Callable[[str], str]] = None,
+    llm: Optional[dspy.LM] = None,
+    num_threads: Optional[int] = None
+) -> List[Optional[Tuple[str, Dict[str, Any]]]]:
+    """
+    Run IngestAugmentation over all documents concurrently with Module.batch.
+    Returns (augmented_text, extracted_metadata) aligned with documents; the entry is None
+    for a document whose LLM calls failed, so the caller can skip or report it.
+    Results are cached by content hash, so only documents not seen before reach the LLM.
+    """
+    if llm is None:
+        llm = get_openrouter_llm()
+    options = (getattr(llm, "model", None), target_language, normalize_language, augment_metadata, summarize_fn)
+    keys = [(hashlib.sha256(doc.encode('utf-8')).hexdigest(),) + options for doc in documents]
+    augmented: List[Optional[Tuple[str, Dict[str, Any]]]] = [None] * len(documents)
+    with _AUGMENT_CACHE_LOCK:
+        for i, key in enumerate(keys):
+            augmented[i] = _AUGMENT_CACHE.get(key)
+    # Each distinct uncached text is sent once, even if it repeats within the batch
+    pending = {}
+    for i, key in enumerate(keys):
+        if augmented[i] is None:
+            pending.setdefault(key, []).append(i)
+    if pending:
+        program = IngestAugmentation(normalize_language=normalize_language, augment_metadata=augment_metadata, summarize_fn=summarize_fn)
+        examples = [
+            dspy.Example(text=documents[indices[0]], target_language=target_language).with_inputs('text', 'target_language')
+            for indices in pending.values()
+        ]
+        with dspy.context(lm=llm):
+            results = program.batch(examples, num_threads=num_threads or settings.LLM_NUM_THREADS, disable_progress_bar=True)
+        with _AUGMENT_CACHE_LOCK:
+            for (key, indices), result in zip(pending.items(), results):
+                if result is None:
+                    # Not cached, so the next ingest of this text retries the LLM
+                    logger.warning(f"LLM augmentation failed for documents at positions {indices}")
+                    continue
+                _AUGMENT_CACHE[key] = (result.text, result.metadata)
+                for i in indices:
+                    augmented[i] = (result.text, result.metadata)
+    return [(entry[0], dict(entry[1])) if entry is not None else None for entry in augmented]
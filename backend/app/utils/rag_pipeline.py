@@ -1,4 +1,5 @@
 import dspy
+import numpy as np
 
 class RAGHybridFusedRerank(dspy.Module):
     """
@@ -8,6 +9,9 @@ class RAGHybridFusedRerank(dspy.Module):
     3. Neural Reranking (CrossEncoder)
     4. LLM Generation
     """
+    # Rank offset of reciprocal rank fusion: score(doc) = sum over retrievers of 1 / (RRF_K + rank)
+    RRF_K = 60
+
     def __init__(self, vector_retriever, keyword_retriever, reranker_model, llm, rerank_k=3):
         super().__init__()
         self.vector_retrieve = vector_retriever
@@ -22,28 +26,44 @@ class RAGHybridFusedRerank(dspy.Module):
         # Extract text for reranking, keep original object
         if not documents_with_meta:
             return []
+        if self.reranker is None:
+            # No cross-encoder configured: keep the fused retrieval order
+            return documents_with_meta[:self.rerank_k]
         texts_to_rank = [doc['long_text'] for doc in documents_with_meta]
         if not texts_to_rank:
             return []
-        scores = self.reranker.predict([(query, text) for text in texts_to_rank])
-        # Combine original objects with scores and sort
-        ranked = sorted(zip(documents_with_meta, scores), key=lambda x: x[1], reverse=True)
+        scores = self.reranker.predict(
+            [(query, text) for text in texts_to_rank],
+            batch_size=64, convert_to_numpy=True, show_progress_bar=False
+        )
+        scores = np.asarray(scores, dtype=np.float32)
+        # Select the top K without sorting every candidate, then order only those K
+        k = min(self.rerank_k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
         # Return the top K original objects
-        return [doc for doc, _ in ranked[:self.rerank_k]]
+        return [documents_with_meta[i] for i in top.tolist()]
 
     def forward(self, question, use_llm=True):
         vector_results = self.vector_retrieve(question) # List of dspy.Example
         keyword_results = self.keyword_retrieve(question) # List of dspy.Example
 
-        # Fuse based on a unique identifier if available (e.g., 'id'), otherwise fallback to text
-        # Assuming retrievers return dspy.Example objects with an 'id' field
+        # Reciprocal rank fusion keyed on the document id both retrievers attach; documents
+        # without one (e.g. a BM25 corpus indexed without ids) are keyed by the hash of their text
         fused_docs_map = {}
-        for doc in vector_results + keyword_results:
-            doc_id = doc.get('id', doc.get('long_text')) # Use ID if present, else text
-            if doc_id not in fused_docs_map:
-                fused_docs_map[doc_id] = doc
+        rrf_scores = {}
+        for results in (vector_results, keyword_results):
+            for rank, doc in enumerate(results, start=1):
+                doc_id = doc.get('id') or hash(doc.long_text)
+                if doc_id not in fused_docs_map:
+                    fused_docs_map[doc_id] = doc
+                rrf_scores[doc_id] = rrf_scores.get(doc_id, 0.0) + 1.0 / (self.RRF_K + rank)
 
-        fused_list = list(fused_docs_map.values()) # List of unique dspy.Example
+        # Only the best 2 * rerank_k fused candidates go to the cross-encoder
+        top_ids = sorted(rrf_scores, key=rrf_scores.get, reverse=True)[:2 * self.rerank_k]
+        fused_list = [fused_docs_map[doc_id] for doc_id in top_ids] # List of unique dspy.Example
 
         # Rerank based on text, but return the full dspy.Example objects
         reranked_examples = self.rerank(question, fused_list)
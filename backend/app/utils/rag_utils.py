@@ -1,25 +1,27 @@
-from app.services.embedding_service import get_embedding_model
-from app.services.rerank_service import get_reranker
-import dspy
-from .bm25_utils import BM25Processor
-from .retrievers import VectorRetriever, BM25Retriever
-from .rag_pipeline import RAGHybridFusedRerank
-from app.services.chroma_client import get_vector_db_client
-from app.services.faiss_client import get_faiss_client
-from app.utils.dspy_utils import get_openrouter_llm
+import hashlib
+import logging
 from typing import List, Dict, Any, Optional, Callable
-from app.utils.llm_augmentation import llm_summarize, llm_extract_metadata, llm_normalize_language
+
+logger = logging.getLogger(__name__)
+
+# Heavy dependencies (torch/sentence-transformers, chromadb, faiss, nltk, dspy) are imported
+# inside the functions that need them, so importing this module stays cheap.
 
 def load_components(db_type, db_path, embedder_model, reranker_model, llm=None):
+    from app.services.embedding_service import get_embedding_model
+    from app.services.rerank_service import get_reranker
     embedder = get_embedding_model(embedder_model)
     reranker = get_reranker(reranker_model)
     if db_type == 'chroma':
+        from app.services.chroma_client import get_vector_db_client
         client = get_vector_db_client(db_path)
     elif db_type == 'faiss':
+        from app.services.faiss_client import get_faiss_client
         client = get_faiss_client(db_path)
     else:
         raise ValueError(f"Unknown db_type: {db_type}")
     if llm is None:
+        from app.utils.dspy_utils import get_openrouter_llm
         llm = get_openrouter_llm()
     return embedder, reranker, client, llm
 
@@ -39,45 +41,71 @@ def index_vector_data(
     target_language: str = "en",
     use_llm: bool = False
 ) -> List[str]:
-    collection = client.get_or_create_collection(collection_name)
+    from app.services.chroma_client import COLLECTION_METADATA, invalidate_collection_cache
+    collection = client.get_or_create_collection(collection_name, metadata=COLLECTION_METADATA)
     if clear_existing:
-        # Chroma and FAISS both have a delete/clear method
-        if hasattr(collection, 'delete'):
-            existing_ids = collection.get(include=[])['ids']
-            if existing_ids:
-                collection.delete(ids=existing_ids)
-        elif hasattr(collection, 'clear'):
+        if hasattr(collection, 'clear'):
+            # FAISS collections reset their index in place
             collection.clear()
-    # Deduplication by content hash
-    final_docs, final_ids, final_embeddings, final_metadatas = [], [], [], []
-    for i, doc in enumerate(documents):
-        # Normalize language
-        if normalize_language and use_llm:
-            doc = llm_normalize_language(doc, target_language)
-        # LLM-based summarization (if provided)
-        if use_llm:
-            if llm_augment:
-                doc = llm_augment(doc)
-            else:
-                doc = llm_summarize(doc)
-        # Compute embedding
-        embedding = embedder.encode(doc).tolist()
-        # Deduplication: check for content hash
-        import hashlib
-        content_hash = hashlib.sha256(doc.encode('utf-8')).hexdigest()
-        exists = collection.get(where={"content_hash": content_hash})
-        if deduplicate and exists and exists.get("ids"):
+        else:
+            # Chroma: dropping and recreating the collection avoids listing every id just to delete it
+            client.delete_collection(collection_name)
+            collection = client.get_or_create_collection(collection_name, metadata=COLLECTION_METADATA)
+            # Cached handles to the dropped collection, and pipelines built on it, are stale now
+            invalidate_collection_cache(collection_name)
+    # LLM augmentation (normalize, summarize, extract metadata) for all documents in one batch
+    extracted_metadatas = [{} for _ in documents]
+    if use_llm:
+        from app.utils.llm_augmentation import llm_summarize, llm_augment_documents
+        augmented = llm_augment_documents(
+            documents,
+            target_language=target_language,
+            normalize_language=normalize_language,
+            augment_metadata=augment_metadata,
+            # llm_summarize is the built-in summarization step of the batched program
+            summarize_fn=llm_augment if llm_augment not in (None, llm_summarize) else None,
+        )
+        failed = [doc_ids[i] for i, entry in enumerate(augmented) if entry is None]
+        if failed:
+            # Storing the raw text would index these documents unlike the rest of the collection
+            logger.warning(f"Skipping {len(failed)} documents in '{collection_name}' whose LLM augmentation failed: {failed}")
+            keep = [i for i, entry in enumerate(augmented) if entry is not None]
+            augmented = [augmented[i] for i in keep]
+            doc_ids = [doc_ids[i] for i in keep]
+            if metadatas:
+                metadatas = [metadatas[i] if i < len(metadatas) else {} for i in keep]
+        documents = [text for text, _ in augmented]
+        extracted_metadatas = [extracted for _, extracted in augmented]
+
+    # Pass 1: deduplication by content hash, with one bulk lookup against the store
+    hashes = [hashlib.sha256(doc.encode('utf-8')).hexdigest() for doc in documents]
+    existing_hashes = set()
+    if deduplicate and hashes:
+        existing = collection.get(where={"content_hash": {"$in": list(set(hashes))}}, include=["metadatas"])
+        existing_hashes = {m.get("content_hash") for m in (existing.get("metadatas") or []) if m}
+    kept = []
+    for i, content_hash in enumerate(hashes):
+        if deduplicate and content_hash in existing_hashes:
             continue
-        # Augment metadata
+        # Also drops repeats within this batch
+        existing_hashes.add(content_hash)
+        kept.append((i, content_hash))
+    final_docs = [documents[i] for i, _ in kept]
+    final_ids = [doc_ids[i] for i, _ in kept]
+    # Pass 2: one batched encode for every document that will be stored
+    final_embeddings = []
+    if final_docs:
+        final_embeddings = embedder.encode(
+            final_docs, batch_size=64, show_progress_bar=False, convert_to_numpy=True, normalize_embeddings=True
+        ).tolist()
+    # Pass 3: metadata
+    final_metadatas = []
+    for i, content_hash in kept:
         meta = metadatas[i] if (metadatas and i < len(metadatas)) else {}
         meta = dict(meta) if meta else {}
         meta["content_hash"] = content_hash
         if augment_metadata and use_llm:
-            extracted = llm_extract_metadata(doc)
-            meta.update({k: v for k, v in extracted.items() if k not in meta})
-        final_docs.append(doc)
-        final_ids.append(doc_ids[i])
-        final_embeddings.append(embedding)
+            meta.update({k: v for k, v in extracted_metadatas[i].items() if k not in meta})
         final_metadatas.append(meta)
     if final_docs:
         collection.add(
@@ -94,17 +122,22 @@ def create_bm25_index(documents):
         class EmptyBM25Processor:
             def get_scores(self, query):
                 return []
+            def get_top_k(self, query, k):
+                return []
         return EmptyBM25Processor()
+    from .bm25_utils import BM25Processor
     return BM25Processor(documents)
 
 def create_retrievers(collection, embedder, bm25_processor, corpus, doc_ids: Optional[List[str]] = None, metadatas: Optional[List[Dict[str, Any]]] = None, k_embed=5, k_bm25=5):
     """Creates vector and BM25 retrievers, passing IDs and metadata to BM25Retriever."""
+    from .retrievers import VectorRetriever, BM25Retriever
     vector_retriever = VectorRetriever(collection, embedder, k=k_embed)
     # Pass doc_ids and metadatas to BM25Retriever
     bm25_retriever = BM25Retriever(bm25_processor, corpus, doc_ids=doc_ids, metadatas=metadatas, k=k_bm25)
     return vector_retriever, bm25_retriever
 
 def create_rag_pipeline(vector_retriever, keyword_retriever, reranker_model, llm, k_rerank=3):
+    from .rag_pipeline import RAGHybridFusedRerank
     return RAGHybridFusedRerank(
         vector_retriever=vector_retriever,
         keyword_retriever=keyword_retriever,
@@ -1,4 +1,5 @@
 import dspy
+from app.services.embedding_service import embed_query
 
 class VectorRetriever(dspy.Retrieve):
     """DSPy Retriever for either ChromaDB or FAISS collections using SentenceTransformer embeddings."""
@@ -10,7 +11,8 @@ class VectorRetriever(dspy.Retrieve):
 
     def forward(self, query, k=None):
         k = k or self._k
-        query_emb = self._embedder.encode([query], show_progress_bar=False).tolist()
+        # Every source's retriever embeds the same query; the embedding is computed once and cached
+        query_emb = [embed_query(self._embedder, query).tolist()]
         # Only include valid Chroma/FAISS fields
         results = self._collection.query(query_embeddings=query_emb, n_results=k, include=['documents', 'metadatas'])
 
@@ -52,16 +54,11 @@ class BM25Retriever(dspy.Retrieve):
 
     def forward(self, query, k=None):
         k = k or self._k
-        scores = self._bm25_processor.get_scores(query)
-        # Ensure all scores are floats (handle str/float mix)
-        scores = [float(s) if not isinstance(s, float) else s for s in scores]
-        # Get indices and scores, sorted by score
-        ranked_indices_scores = sorted(enumerate(scores), key=lambda x: x[1], reverse=True)
+        # Top-k selection happens inside the BM25 index; results come back best first
+        ranked_indices_scores = self._bm25_processor.get_top_k(query, k)
 
         docs = []
         for i, score in ranked_indices_scores:
-            if score <= 0 or len(docs) >= k:
-                break # Stop if score is non-positive or we have enough docs
             # Get the original document text, ID, and metadata using the index 'i'
             doc_text = self._corpus[i]
             doc_id = self._doc_ids[i]
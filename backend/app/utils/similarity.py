@@ -3,6 +3,17 @@ logger = logging.getLogger(__name__)
 
 import numpy as np
 
+def compute_similarity_scores(cosine_similarities) -> np.ndarray:
+    """
+    Vectorized compute_similarity_score over an array of cosine similarities.
+    Args:
+        cosine_similarities: Array-like of cosine similarities, typically in [-1, 1]
+    Returns:
+        np.ndarray: Similarity scores in the range [0.0, 1.0]
+    """
+    # Map cosine similarity [-1, 1] to [0, 1]
+    return np.clip((np.asarray(cosine_similarities, dtype=np.float32) + 1.0) * 0.5, 0.0, 1.0)
+
 def compute_similarity_score(cosine_similarity: float) -> float:
     """
     Compute the similarity score given a cosine similarity value.
@@ -11,10 +22,50 @@ def compute_similarity_score(cosine_similarity: float) -> float:
     Returns:
         float: The similarity score in the range [0.0, 1.0]
     """
-    logger.info(f"Cosine similarity: {cosine_similarity}")
     # Map cosine similarity [-1, 1] to [0, 1]
-    score = (cosine_similarity + 1) / 2
-    return min(max(score, 0), 1)
+    return min(max((cosine_similarity + 1) / 2, 0.0), 1.0)
+
+def distance_to_similarity(distance: float) -> float:
+    """
+    Convert a vector store distance into a similarity score.
+    Collections use the inner-product space over unit-normalized embeddings, so the
+    reported distance is 1 - cosine similarity.
+    Args:
+        distance (float): Distance returned by the vector store query
+    Returns:
+        float: The similarity score in the range [0.0, 1.0]
+    """
+    return float(np.clip(1.0 - distance, 0.0, 1.0))
+
+def distances_to_similarities(distances) -> list:
+    """
+    Vectorized distance_to_similarity for a batch of vector store distances.
+    Args:
+        distances: Array-like of distances returned by the vector store query
+    Returns:
+        list: Similarity scores in the range [0.0, 1.0], aligned with distances
+    """
+    return np.clip(1.0 - np.asarray(distances, dtype=np.float64), 0.0, 1.0).tolist()
+
+def compute_text_similarity_scores(query: str, texts: list, embedder=None) -> list:
+    """
+    Compute similarity scores between a query and many texts with a single batched encode.
+    Args:
+        query (str): Query text.
+        texts (list): Texts to score against the query.
+        embedder: SentenceTransformer or similar embedding model (optional, will load if not provided).
+    Returns:
+        list: Similarity scores in [0.0, 1.0], aligned with texts.
+    """
+    from app.services.embedding_service import get_embedding_model
+    if not texts:
+        return []
+    if embedder is None:
+        embedder = get_embedding_model()
+    embeddings = embedder.encode([query] + list(texts), batch_size=64, normalize_embeddings=True)
+    # Unit vectors: cosine similarity is a plain dot product
+    cosine_sims = embeddings[1:] @ embeddings[0]
+    return compute_similarity_scores(cosine_sims).tolist()
 
 def compute_text_similarity_score(text1: str, text2: str, embedder=None) -> float:
     """
@@ -26,11 +77,4 @@ def compute_text_similarity_score(text1: str, text2: str, embedder=None) -> floa
     Returns:
         float: Similarity score in [0.0, 1.0]
     """
-    from app.services.embedding_service import get_embedding_model
-    if embedder is None:
-        embedder = get_embedding_model()
-    emb1 = embedder.encode([text1])[0]
-    emb2 = embedder.encode([text2])[0]
-    # Compute cosine similarity
-    cosine_sim = float(np.dot(emb1, emb2) / (np.linalg.norm(emb1) * np.linalg.norm(emb2)))
-    return compute_similarity_score(cosine_sim)
+    return compute_text_similarity_scores(text1, [text2], embedder)[0]
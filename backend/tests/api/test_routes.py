@@ -1,86 +1,75 @@
-import sys
-from pathlib import Path
-from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock, AsyncMock
-from datetime import datetime
+from types import SimpleNamespace
 import pytest
-import json
-import httpx
-
-# Add backend directory to path
-backend_dir = Path(__file__).parent.parent.parent
-sys.path.append(str(backend_dir))
-
-from app.main import app
-from app.models import SearchQuery, IssueResponse
-
-client = TestClient(app)
 
+# Shared read-only fixture data, built once at import; copy.deepcopy before mutating
+_TS = "2024-01-01T00:00:00"
+
+_MOCK_JIRA = {
+    "key": "PROJ-123",
+    "summary": "Test Issue",
+    "description": "Test description",
+    "status": "Open",
+    "created": _TS,
+    "updated": _TS,
+    "comments": [
+        {"author": {"displayName": "Test User"}, "body": "Test comment"}
+    ]
+}
+
+_MOCK_SEARCH_RESULTS = [
+    {
+        "id": "test_1",
+        "title": "Test Issue 1",
+        "description": "Test description 1",
+        "sender": "test1@example.com",
+        "received_date": _TS,
+        "jira_ticket_id": "PROJ-123",
+        "similarity_score": 0.95,
+        "created_at": _TS,
+        "updated_at": _TS,
+        "root_cause": None,
+        "solution": None,
+        "jira_data": None
+    },
+    {
+        "id": "test_2",
+        "title": "Test Issue 2",
+        "description": "Test description 2",
+        "sender": "test2@example.com",
+        "received_date": _TS,
+        "jira_ticket_id": "PROJ-124",
+        "similarity_score": 0.9,
+        "created_at": _TS,
+        "updated_at": _TS,
+        "root_cause": None,
+        "solution": None,
+        "jira_data": None
+    }
+]
+
+# The shared aclient fixture lives on the session event loop, so the tests must run on it too
+@pytest.mark.asyncio(loop_scope="session")
 class TestRoutes:
-    def get_mock_jira_data(self):
-        return {
-            "key": "PROJ-123",
-            "summary": "Test Issue",
-            "description": "Test description",
-            "status": "Open",
-            "created": datetime.now().isoformat(),
-            "updated": datetime.now().isoformat(),
-            "comments": [
-                {"author": {"displayName": "Test User"}, "body": "Test comment"}
-            ]
-        }
+    async def test_get_jira_ticket_info(self, mock_attr, aclient):
+        mock_get_ticket = mock_attr('app.api.routes', 'get_jira_ticket')
+        mock_get_ticket.return_value = _MOCK_JIRA
 
-    @patch('app.api.routes.get_jira_ticket')
-    def test_get_jira_ticket_info(self, mock_get_ticket):
-        mock_jira_data = self.get_mock_jira_data()
-        mock_get_ticket.return_value = mock_jira_data
-
-        response = client.get("/api/jira-ticket/PROJ-123")
+        response = await aclient.get("/api/jira-ticket/PROJ-123")
         assert response.status_code == 200
         assert response.json()["status"] == "success"
-        assert response.json()["jira_data"] == mock_jira_data
-
-    @patch('app.services.vector_service.search_similar_issues')
-    @patch('app.services.vector_service.add_issue_to_vectordb')
-    @patch('app.services.vector_service.get_vector_db_client')
-    @patch('app.services.embedding_service.get_embedding_model')
-    def test_search_issues(self, mock_get_embedding_model, mock_get_vector_db_client, mock_add_issue_to_vectordb, mock_search):
-        mock_results = [
-            {
-                "id": "test_1",
-                "title": "Test Issue 1",
-                "description": "Test description 1",
-                "sender": "test1@example.com",
-                "received_date": datetime.now().isoformat(),
-                "jira_ticket_id": "PROJ-123",
-                "similarity_score": 0.95,
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat(),
-                "root_cause": None,
-                "solution": None,
-                "jira_data": None
-            },
-            {
-                "id": "test_2",
-                "title": "Test Issue 2",
-                "description": "Test description 2",
-                "sender": "test2@example.com",
-                "received_date": datetime.now().isoformat(),
-                "jira_ticket_id": "PROJ-124",
-                "similarity_score": 0.9,
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat(),
-                "root_cause": None,
-                "solution": None,
-                "jira_data": None
-            }
-        ]
-        mock_search.return_value = mock_results
-        mock_get_embedding_model.return_value = MagicMock()
-        mock_get_vector_db_client.return_value = MagicMock()
-        mock_add_issue_to_vectordb.return_value = MagicMock()
-
-        response = client.post(
+        assert response.json()["jira_data"] == _MOCK_JIRA
+
+    async def test_search_issues(self, mock_attr, aclient):
+        mock_search = mock_attr('app.api.routes', 'search_similar_issues')
+        mock_add_issue_to_vectordb = mock_attr('app.services.vector_service', 'add_issue_to_vectordb')
+        mock_get_vector_db_client = mock_attr('app.services.vector_service', 'get_vector_db_client')
+        mock_get_embedding_model = mock_attr('app.services.embedding_service', 'get_embedding_model')
+        mock_search.return_value = _MOCK_SEARCH_RESULTS
+        mock_get_embedding_model.return_value = SimpleNamespace()
+        mock_get_vector_db_client.return_value = SimpleNamespace()
+        mock_add_issue_to_vectordb.return_value = SimpleNamespace()
+
+        response = await aclient.post(
             "/api/search",
             json={"query_text": "test query", "limit": 2}
         )
@@ -90,61 +79,41 @@ class TestRoutes:
         assert results[0]["jira_ticket_id"] == "PROJ-123"
         assert results[1]["jira_ticket_id"] == "PROJ-124"
 
-    @patch('app.services.vector_service.delete_issue')
-    def test_delete_issue(self, mock_delete):
+    @pytest.mark.xdist_group("chroma")
+    async def test_delete_issue(self, mock_attr, aclient):
+        mock_delete = mock_attr('app.api.routes', 'delete_issue')
         mock_delete.return_value = True
 
-        response = client.delete("/api/issues/test_1")
+        response = await aclient.delete("/api/issues/test_1")
         
         assert response.status_code == 200
         result = response.json()
         assert result["status"] == "success"
         assert "test_1" in result["message"]
 
-    @patch('app.services.msg_parser.parse_msg_file')
-    @patch('app.services.vector_service.add_issue_to_vectordb')
-    def test_ingest_msg_directory(self, mock_add_to_vectordb, mock_parse_msg):
-        mock_msg_data = {
-            "subject": "Test Issue",
-            "body": "Test content",
-            "sender": "test@example.com",
-            "received_date": datetime.now().isoformat(),
-            "jira_id": "PROJ-123"
-        }
-        mock_parse_msg.return_value = mock_msg_data
-        mock_add_to_vectordb.return_value = "test_issue_1"
-
-        # The actual endpoint expects files, not json, so we simulate the wrong input and check for 422
-        response = client.post(
-            "/api/ingest-msg-dir",
-            json={"directory_path": "/test/path"}
-        )
-        assert response.status_code == 422  # Unprocessable Entity due to wrong input type
-
-    @patch('app.api.routes.add_confluence_page_to_vectordb')
-    def test_ingest_confluence_page(self, mock_add_confluence):
-        mock_add_confluence.return_value = "test_page_1"
-
-        # The actual endpoint expects {"confluence_urls": [...]}, not {"confluence_url": ...}
-        response = client.post(
-            "/api/ingest-confluence",
-            json={"confluence_urls": ["https://confluence.example.com/page"]}
-        )
-        assert response.status_code == 200
-        result = response.json()
-        assert result["results"][0]["status"] == "success"
-        assert result["results"][0]["page_id"] == "test_page_1"
-
-    @patch('app.api.routes.add_stackoverflow_qa_to_vectordb')
-    def test_ingest_stackoverflow_qa(self, mock_add_stackoverflow):
-        mock_add_stackoverflow.return_value = ["test_qa_1"]
-
-        response = client.post(
-            "/api/ingest-stackoverflow",
-            json={"stackoverflow_urls": ["https://stackoverflow.com/questions/123"]}
-        )
-        
-        assert response.status_code == 200
-        result = response.json()
-        assert result["results"][0]["status"] == "success"
-        assert result["results"][0]["ids"] == ["test_qa_1"]
\ No newline at end of file
+    @pytest.mark.parametrize(
+        "endpoint, payload, patch_target, patch_return, expected_status, expected_result",
+        [
+            # The MSG endpoint expects files, not json, so the wrong input type is rejected with 422
+            ("/api/ingest-msg-dir", {"directory_path": "/test/path"},
+             ("app.services.msg_parser", "parse_msg_file"), {"subject": "Test Issue", "body": "Test content"},
+             422, None),
+            ("/api/ingest-confluence", {"confluence_urls": ["https://confluence.example.com/page"]},
+             ("app.api.routes", "add_confluence_pages_to_vectordb"), ["test_page_1"],
+             200, {"status": "success", "page_id": "test_page_1"}),
+            ("/api/ingest-stackoverflow", {"stackoverflow_urls": ["https://stackoverflow.com/questions/123"]},
+             ("app.api.routes", "add_stackoverflow_qa_to_vectordb"), ["test_qa_1"],
+             200, {"status": "success", "ids": ["test_qa_1"]}),
+        ],
+        ids=["msg-dir", "confluence", "stackoverflow"],
+    )
+    async def test_ingest_endpoint(self, endpoint, payload, patch_target, patch_return, expected_status, expected_result, mock_attr, aclient):
+        mock_attr(*patch_target, return_value=patch_return)
+
+        response = await aclient.post(endpoint, json=payload)
+
+        assert response.status_code == expected_status
+        if expected_result is not None:
+            first = response.json()["results"][0]
+            for key, value in expected_result.items():
+                assert first[key] == value
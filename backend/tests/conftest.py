@@ -1,7 +1,73 @@
+import importlib
 import os
-import sys
-from pathlib import Path
 
-# Add the project root directory to Python path
-project_root = Path(__file__).parent.parent
-sys.path.append(str(project_root))
\ No newline at end of file
+# Score BM25 with plain numpy so no test pays numba's JIT compile, and keep numba from compiling
+# anything else that imports it. Set either variable beforehand to exercise the numba path.
+os.environ.setdefault("BM25_BACKEND", "numpy")
+os.environ.setdefault("NUMBA_DISABLE_JIT", "1")
+
+import pytest
+import pytest_asyncio
+from unittest.mock import MagicMock
+
+
+@pytest.fixture(scope="session")
+def app():
+    """The FastAPI app, imported on first use so test collection does not load the app's dependencies."""
+    from app.main import app as _app
+    return _app
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def aclient(app):
+    """
+    One httpx AsyncClient shared by every API test in the run. Requests are dispatched straight
+    to the ASGI app on the session event loop, without TestClient's per-call thread portal.
+    """
+    import httpx
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def _fake_embedding_model_session():
+    import numpy as np
+    model = MagicMock()
+    model.encode.return_value = np.array([0.1, 0.2, 0.3])
+    return model
+
+
+@pytest.fixture
+def fake_embedding_model(_fake_embedding_model_session):
+    """Session-wide mock embedding model whose encode returns a fixed 3-d vector; call history is reset per test."""
+    _fake_embedding_model_session.reset_mock()
+    return _fake_embedding_model_session
+
+
+@pytest.fixture(scope="session")
+def _http_mock_session():
+    import responses
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rm:
+        yield rm
+
+
+@pytest.fixture
+def http_mock(_http_mock_session):
+    """Session-wide `responses` transport for requests; URLs registered in a test are cleared after it."""
+    yield _http_mock_session
+    _http_mock_session.reset()
+
+
+@pytest.fixture
+def mock_attr(monkeypatch):
+    """
+    Replace an attribute of a module with a fresh MagicMock for one test.
+    The module may be given by name, so test modules need not import the app at collection time.
+    """
+    def _mock(module, name, **kwargs):
+        if isinstance(module, str):
+            module = importlib.import_module(module)
+        mock = MagicMock(**kwargs)
+        monkeypatch.setattr(module, name, mock)
+        return mock
+    return _mock
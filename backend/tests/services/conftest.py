@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+
+@pytest.fixture
+def jira_env(mocker):
+    """
+    jira_service with the JIRA client class and settings patched to a valid Jira configuration.
+    Yields the patched JIRA class, the client instance it returns (whose myself() succeeds)
+    and settings for per-test adjustment.
+    """
+    from app.services import jira_service
+    settings = mocker.patch.object(jira_service, "settings")
+    settings.JIRA_URL = "https://jira.example.com"
+    settings.JIRA_USERNAME = "test_user"
+    settings.JIRA_API_TOKEN = "test_token"
+    settings.has_valid_jira_config = True
+    jira = mocker.patch.object(jira_service, "JIRA")
+    jira.return_value.myself.return_value = {"displayName": "Test User"}
+    return SimpleNamespace(JIRA=jira, client=jira.return_value, settings=settings)
+
+
+@pytest.fixture
+def msg_env(mocker, tmp_path):
+    """
+    msg_parser with extract_msg.Message patched, plus an empty placeholder .msg file on disk
+    so the parser's real existence check passes. Yields the Message mock and the file path.
+    """
+    from app.services import msg_parser
+    msg_file = tmp_path / "test.msg"
+    msg_file.touch()
+    return SimpleNamespace(
+        Message=mocker.patch.object(msg_parser.extract_msg, "Message"),
+        file_path=str(msg_file),
+    )
+
+
+@pytest.fixture(scope="session")
+def fake_embedding():
+    """One 384-d float32 embedding (the all-MiniLM-L6-v2 width), allocated once per run."""
+    import numpy as np
+    return np.full(384, 0.1, dtype=np.float32)
+
+
+@pytest.fixture
+def patched_vector_service(mocker, fake_embedding):
+    """
+    vector_issue_service ingesting synchronously into a mock issues collection, with the
+    embedding model patched to return fake_embedding. Yields the collection and model mocks.
+    """
+    from app.services import embedding_service, vector_issue_service
+    collection = MagicMock()
+    collection.get.return_value = {"ids": []}
+    model = MagicMock()
+    model.encode.return_value = fake_embedding
+    mocker.patch.object(vector_issue_service, "get_collection", return_value=collection)
+    mocker.patch.object(vector_issue_service, "get_embedding_model", return_value=model)
+    mocker.patch.object(embedding_service, "get_embedding_model", return_value=model)
+    mocker.patch.object(vector_issue_service.settings, "ASYNC_INGEST", False)
+    mocker.patch.object(vector_issue_service.settings, "EMBEDDING_BF16", False)
+    return SimpleNamespace(collection=collection, model=model)
@@ -1,72 +1,75 @@
-import pytest
-from unittest.mock import patch, MagicMock
-import chromadb
-from datetime import datetime
 import numpy as np
+import pytest
+import responses
+from unittest.mock import MagicMock
 
 import app.services.confluence_service as confluence_service
-from app.services.embedding_service import get_embedding_model
 
 class TestConfluenceService:
+    # Read-only collection.query results shared by the search tests
+    _QUERY_RESULT = {
+        "ids": [["page1"]],
+        "metadatas": [[{"confluence_url": "https://confluence.example.com/page1"}]],
+        "documents": [["Test Content"]],
+        "distances": [[0.05]]
+    }
+    _FLAT_QUERY_RESULT = {
+        "ids": ["mock_id"],
+        "metadatas": [{"title": "Mock Page"}],
+        "documents": ["Mock content"],
+        "distances": [0.1]
+    }
     
-    @patch('app.services.confluence_service.get_vector_db_client')
-    @patch('app.services.confluence_service.get_embedding_model')
-    def test_get_vector_db_client(self, mock_get_embedding_model, mock_get_client):
+    def test_get_vector_db_client(self, mocker):
+        mock_get_client = mocker.patch.object(confluence_service, 'get_vector_db_client')
         mock_client = MagicMock()
         mock_get_client.return_value = mock_client
-        mock_get_embedding_model.return_value = MagicMock()
         result = confluence_service.get_vector_db_client()
         assert result == mock_client
         mock_get_client.assert_called_once()
 
-    @patch('app.services.confluence_service.get_embedding_model')
-    def test_get_embedding_model(self, mock_get_embedding_model):
-        mock_model = MagicMock()
-        mock_get_embedding_model.return_value = mock_model
+    def test_get_embedding_model(self, mocker, fake_embedding_model):
+        mock_get_embedding_model = mocker.patch.object(confluence_service, 'get_embedding_model')
+        mock_get_embedding_model.return_value = fake_embedding_model
         result = confluence_service.get_embedding_model()
-        assert result == mock_model
+        assert result == fake_embedding_model
         mock_get_embedding_model.assert_called_once()
 
-    @patch('app.services.confluence_service.requests.get')
-    @patch('bs4.BeautifulSoup')
-    def test_fetch_confluence_content_success(self, mock_bs, mock_get):
-        mock_response = MagicMock()
-        mock_response.text = "<html><body><div id='main-content'>Test Content</div></body></html>"
-        mock_get.return_value = mock_response
-        
-        mock_soup = MagicMock()
-        mock_main_content = MagicMock()
-        mock_main_content.get_text.return_value = "Test Content"
-        mock_soup.find.return_value = mock_main_content
-        mock_bs.return_value = mock_soup
-        
-        mock_response.raise_for_status = MagicMock()
+    def test_fetch_confluence_content_success(self, http_mock, monkeypatch):
+        monkeypatch.setenv("CONFLUENCE_USERNAME", "admin")
+        monkeypatch.setenv("CONFLUENCE_PASSWORD", "admin")
+        http_mock.add(
+            responses.GET,
+            "https://confluence.example.com/page",
+            body="<html><body><div id='main-content'>Test Content</div></body></html>",
+        )
         
         result = confluence_service.fetch_confluence_content("https://confluence.example.com/page")
         
         assert result["content"] == "Test Content"
-        mock_get.assert_called_once()
-        assert mock_get.call_args[0][0] == "https://confluence.example.com/page"
-        mock_response.raise_for_status.assert_called_once()
-        mock_bs.assert_called_once_with(mock_response.text, "html.parser")
-        mock_soup.find.assert_any_call("div", {"id": "main-content"})
-        mock_main_content.get_text.assert_any_call(separator="\n", strip=True)
+        assert len(http_mock.calls) == 1
+        assert http_mock.calls[0].request.url == "https://confluence.example.com/page"
 
-    @patch('app.services.confluence_service.requests.get')
-    def test_fetch_confluence_content_error(self, mock_get):
-        mock_get.side_effect = Exception("Connection error")
+    def test_fetch_confluence_content_error(self, http_mock, monkeypatch):
+        monkeypatch.setenv("CONFLUENCE_USERNAME", "admin")
+        monkeypatch.setenv("CONFLUENCE_PASSWORD", "admin")
+        http_mock.add(
+            responses.GET,
+            "https://confluence.example.com/page",
+            body=ConnectionError("Connection error"),
+        )
         
         result = confluence_service.fetch_confluence_content("https://confluence.example.com/page")
         
         assert result is None
-        mock_get.assert_called_once()
-        assert mock_get.call_args[0][0] == "https://confluence.example.com/page"
+        assert len(http_mock.calls) == 1
+        assert http_mock.calls[0].request.url == "https://confluence.example.com/page"
 
-    @patch('app.services.confluence_service.fetch_confluence_content')
-    @patch('app.services.confluence_service.get_vector_db_client')
-    @patch('app.services.confluence_service.get_embedding_model')
-    @patch('app.services.confluence_service.datetime')
-    def test_add_confluence_page_to_vectordb_success(self, mock_datetime, mock_model, mock_client, mock_fetch):
+    def test_add_confluence_page_to_vectordb_success(self, mocker, fake_embedding_model):
+        mock_datetime = mocker.patch.object(confluence_service, 'datetime')
+        mock_model = mocker.patch.object(confluence_service, 'get_embedding_model')
+        mock_client = mocker.patch.object(confluence_service, 'get_vector_db_client')
+        mock_fetch = mocker.patch.object(confluence_service, 'fetch_confluence_content')
         mock_fetch.return_value = {"content": "Test Content"}
         
         mock_collection = MagicMock()
@@ -75,9 +78,9 @@ class TestConfluenceService:
         mock_db_client.get_or_create_collection.return_value = mock_collection
         mock_client.return_value = mock_db_client
         
-        mock_embedding_model = MagicMock()
-        mock_embedding_model.encode.return_value = np.array([0.1, 0.2, 0.3])
-        mock_model.return_value = mock_embedding_model
+        mock_model.return_value = fake_embedding_model
+        # Pages are encoded as a batch, so encode returns one row per document
+        mocker.patch.object(fake_embedding_model.encode, 'return_value', np.array([[0.1, 0.2, 0.3]]))
         
         mock_now = MagicMock()
         mock_now.strftime.return_value = "20230101120000"
@@ -90,8 +93,10 @@ class TestConfluenceService:
         mock_fetch.assert_called_once_with("https://confluence.example.com/page")
         mock_client.assert_called_once()
         mock_model.assert_called_once()
-        mock_embedding_model.encode.assert_called_once_with("Test Content")
-        mock_db_client.get_or_create_collection.assert_called_once_with("confluence_pages")
+        fake_embedding_model.encode.assert_called_once_with(
+            ["Test Content"], batch_size=64, show_progress_bar=False, convert_to_numpy=True, normalize_embeddings=True
+        )
+        mock_db_client.get_or_create_collection.assert_called_once_with("confluence_pages", metadata={"hnsw:space": "ip"})
         mock_collection.add.assert_called_once()
         
         add_call_args = mock_collection.add.call_args[1]
@@ -101,8 +106,8 @@ class TestConfluenceService:
         assert add_call_args["metadatas"][0]["key"] == "value"
         assert add_call_args["documents"] == ["Test Content"]
 
-    @patch('app.services.confluence_service.fetch_confluence_content')
-    def test_add_confluence_page_to_vectordb_fetch_error(self, mock_fetch):
+    def test_add_confluence_page_to_vectordb_fetch_error(self, mocker):
+        mock_fetch = mocker.patch.object(confluence_service, 'fetch_confluence_content')
         mock_fetch.return_value = None
         
         result = confluence_service.add_confluence_page_to_vectordb("https://confluence.example.com/page")
@@ -110,24 +115,36 @@ class TestConfluenceService:
         assert result is None
         mock_fetch.assert_called_once_with("https://confluence.example.com/page")
 
-    @patch('app.services.confluence_service.get_vector_db_client')
-    @patch('app.services.confluence_service.get_embedding_model')
-    def test_search_similar_confluence_pages_success(self, mock_model, mock_client):
+    @pytest.mark.parametrize("urls", [
+        ["https://confluence.example.com/page1"],
+        ["https://confluence.example.com/page1", "https://confluence.example.com/page2", "https://confluence.example.com/page3"],
+    ])
+    def test_add_confluence_pages_to_vectordb_batches_pages(self, mocker, urls):
+        mocker.patch.object(confluence_service, 'fetch_confluence_content', side_effect=lambda url: {"content": f"Content of {url}"})
+        mocker.patch.object(confluence_service, 'get_vector_db_client')
+        mocker.patch.object(confluence_service, 'get_embedding_model')
+        mock_index = mocker.patch.object(confluence_service, 'index_vector_data', side_effect=lambda **kwargs: kwargs["doc_ids"])
+        
+        result = confluence_service.add_confluence_pages_to_vectordb(urls)
+        
+        assert len(result) == len(urls)
+        assert all(page_id and page_id.startswith("confluence_") for page_id in result)
+        assert len(set(result)) == len(urls)
+        # All pages go through one batched index call
+        mock_index.assert_called_once()
+        assert mock_index.call_args.kwargs["documents"] == [f"Content of {url}" for url in urls]
+
+    def test_search_similar_confluence_pages_success(self, mocker, fake_embedding_model):
+        mock_model = mocker.patch.object(confluence_service, 'get_embedding_model')
+        mock_client = mocker.patch.object(confluence_service, 'get_vector_db_client')
         mock_collection = MagicMock()
-        mock_collection.query.return_value = {
-            "ids": [["page1"]],
-            "metadatas": [[{"confluence_url": "https://confluence.example.com/page1"}]],
-            "documents": [["Test Content"]],
-            "distances": [[0.05]]
-        }
+        mock_collection.query.return_value = self._QUERY_RESULT
         
         mock_db_client = MagicMock()
         mock_db_client.get_or_create_collection.return_value = mock_collection
         mock_client.return_value = mock_db_client
         
-        mock_embedding_model = MagicMock()
-        mock_embedding_model.encode.return_value = np.array([0.1, 0.2, 0.3])
-        mock_model.return_value = mock_embedding_model
+        mock_model.return_value = fake_embedding_model
         
         result = confluence_service.search_similar_confluence_pages("test query", 5)
         
@@ -136,12 +153,12 @@ class TestConfluenceService:
         assert result[0]["metadata"]["confluence_url"] == "https://confluence.example.com/page1"
         mock_client.assert_called_once()
         mock_model.assert_called_once()
-        mock_embedding_model.encode.assert_called_once_with("test query")
-        mock_db_client.get_or_create_collection.assert_called_once_with("confluence_pages")
+        fake_embedding_model.encode.assert_called_once_with("test query")
+        mock_db_client.get_or_create_collection.assert_called_once_with("confluence_pages", metadata={"hnsw:space": "ip"})
         mock_collection.query.assert_called_once()
 
-    @patch('app.services.confluence_service.get_vector_db_client')
-    def test_search_similar_confluence_pages_error(self, mock_client):
+    def test_search_similar_confluence_pages_error(self, mocker):
+        mock_client = mocker.patch.object(confluence_service, 'get_vector_db_client')
         mock_client.side_effect = Exception("Database error")
         
         result = confluence_service.search_similar_confluence_pages("test query")
@@ -149,19 +166,15 @@ class TestConfluenceService:
         assert result is None
         mock_client.assert_called_once()
 
-    @patch('app.services.confluence_service.get_vector_db_client')
-    @patch('app.services.confluence_service.get_embedding_model')
-    def test_search_similar_confluence_pages(self, mock_get_embedding_model, mock_get_client):
+    def test_search_similar_confluence_pages(self, mocker, fake_embedding_model):
+        mock_get_embedding_model = mocker.patch.object(confluence_service, 'get_embedding_model')
+        mock_get_client = mocker.patch.object(confluence_service, 'get_vector_db_client')
         # Mock the vector DB collection and query
         mock_collection = MagicMock()
-        mock_collection.query.return_value = {
-            "ids": ["mock_id"],
-            "metadatas": [{"title": "Mock Page"}],
-            "documents": ["Mock content"],
-            "distances": [0.1]
-        }
+        # Only the returned dict is read, so a plain function skips MagicMock call recording
+        mock_collection.query = lambda *args, **kwargs: self._FLAT_QUERY_RESULT
         mock_get_client.return_value.get_or_create_collection.return_value = mock_collection
-        mock_get_embedding_model.return_value.encode.return_value = MagicMock(tolist=lambda: [0.1, 0.2, 0.3])
+        mock_get_embedding_model.return_value = fake_embedding_model
 
         from app.services.confluence_service import search_similar_confluence_pages
         result = search_similar_confluence_pages("mock query")
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+
+from app.services import embedding_service
+
+
+class TestEmbeddingService:
+
+    @pytest.fixture
+    def query_model(self, mocker, fake_embedding):
+        mocker.patch.object(embedding_service, "_QUERY_EMBEDDING_CACHE", embedding_service.LRUCache(maxsize=8))
+        mocker.patch.object(embedding_service.settings, "EMBEDDING_BF16", False)
+        model = MagicMock()
+        model.encode.return_value = np.array([fake_embedding])
+        # Stand in for the shared model loaded by get_embedding_model
+        mocker.patch.object(embedding_service, "_model_instance", model)
+        mocker.patch.object(embedding_service, "_model_name", "sentence-transformers:test-model")
+        return model
+
+    def test_embed_query_cache_hit(self, query_model, fake_embedding):
+        first = embedding_service.embed_query(query_model, "test query")
+        second = embedding_service.embed_query(query_model, "test query")
+
+        assert np.array_equal(first, fake_embedding)
+        assert second is first
+        query_model.encode.assert_called_once_with(["test query"], show_progress_bar=False, normalize_embeddings=True)
+
+    def test_embed_query_distinct_queries(self, query_model):
+        embedding_service.embed_query(query_model, "first query")
+        embedding_service.embed_query(query_model, "second query")
+
+        assert query_model.encode.call_count == 2
+
+    def test_embed_query_other_model_not_cached(self, query_model, fake_embedding):
+        embedding_service.embed_query(query_model, "test query")
+        other_model = MagicMock()
+        other_model.encode.return_value = np.array([fake_embedding * 2])
+
+        result = embedding_service.embed_query(other_model, "test query")
+
+        assert np.array_equal(result, fake_embedding * 2)
+        other_model.encode.assert_called_once()
@@ -1,6 +1,7 @@
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import DEFAULT, patch, MagicMock
 from datetime import datetime
+from types import MappingProxyType
 
 from app.services.stackoverflow_service import (
     extract_question_id,
@@ -14,11 +15,34 @@ from app.services.embedding_service import get_embedding_model
 from app.services.vector_service import get_vector_db_client
 from app.core import config as core_config
 
+# Frozen fetch_stackoverflow_content result, built once at import
+_SO_FETCH = MappingProxyType({
+    "question_id": "12345678",
+    "question_title": "Sample Question",
+    "question_text": "Question text",
+    "question_url": "https://stackoverflow.com/questions/12345678",
+    "answers": (
+        MappingProxyType({
+            "answer_id": 87654321,
+            "text": "Answer text",
+            "is_accepted": True,
+            "score": 5
+        }),
+    )
+})
+
 class TestStackOverflowService:
-    
+    _SO_URL = "https://stackoverflow.com/questions/12345678/sample-question"
+    # Read-only collection.query result for the search test
+    _QUERY_RESULT = {
+        "ids": ["id1", "id2"],
+        "metadatas": [{"type": "question"}, {"type": "answer"}],
+        "documents": ["doc1", "doc2"],
+        "distances": [0.1, 0.2]
+    }
+
     def test_extract_question_id_valid_url(self):
-        url = "https://stackoverflow.com/questions/12345678/sample-question"
-        assert extract_question_id(url) == "12345678"
+        assert extract_question_id(self._SO_URL) == "12345678"
 
     def test_extract_question_id_invalid_url(self):
         url = "https://stackoverflow.com/invalid/url"
@@ -65,7 +89,7 @@ class TestStackOverflowService:
 
         mock_get.side_effect = [mock_question_response, mock_answers_response]
 
-        result = fetch_stackoverflow_content("https://stackoverflow.com/questions/12345678/sample-question")
+        result = fetch_stackoverflow_content(self._SO_URL)
         
         assert result is not None
         assert result["question_id"] == "12345678"
@@ -73,32 +97,20 @@ class TestStackOverflowService:
         assert len(result["answers"]) == 1
         assert result["answers"][0]["answer_id"] == 87654321
 
-    @patch('app.services.embedding_service.get_embedding_model')
-    @patch('app.services.stackoverflow_service.get_vector_db_client')
-    @patch('app.services.stackoverflow_service.fetch_stackoverflow_content')
-    def test_add_stackoverflow_qa_to_vectordb(self, mock_fetch, mock_client, mock_model):
-        # Mock the fetch content response
-        mock_fetch.return_value = {
-            "question_id": "12345678",
-            "question_title": "Sample Question",
-            "question_text": "Question text",
-            "question_url": "https://stackoverflow.com/questions/12345678",
-            "answers": [{
-                "answer_id": 87654321,
-                "text": "Answer text",
-                "is_accepted": True,
-                "score": 5
-            }]
-        }
+    def test_add_stackoverflow_qa_to_vectordb(self, mocker, fake_embedding_model):
+        mocks = mocker.patch.multiple(
+            "app.services.stackoverflow_service",
+            get_embedding_model=DEFAULT,
+            get_vector_db_client=DEFAULT,
+            fetch_stackoverflow_content=DEFAULT,
+        )
+        mocks["fetch_stackoverflow_content"].return_value = _SO_FETCH
 
-        # Mock the embedding model to return a numpy array with tolist method
-        mock_embedding = MagicMock()
-        mock_embedding.tolist.return_value = [0.1, 0.2, 0.3]
-        mock_model.return_value.encode.return_value = mock_embedding
+        mocks["get_embedding_model"].return_value = fake_embedding_model
 
         # Mock the vector DB client
         mock_collection = MagicMock()
-        mock_client.return_value.get_or_create_collection.return_value = mock_collection
+        mocks["get_vector_db_client"].return_value.get_or_create_collection.return_value = mock_collection
 
         result = add_stackoverflow_qa_to_vectordb("https://stackoverflow.com/questions/12345678")
         
@@ -107,26 +119,21 @@ class TestStackOverflowService:
         assert result[0].startswith("stackoverflow_q_")
         assert result[1].startswith("stackoverflow_a_")
 
-    @patch('app.services.embedding_service.get_embedding_model')
-    @patch('app.services.stackoverflow_service.get_vector_db_client')
-    def test_search_similar_stackoverflow_content(self, mock_client, mock_model):
-        from unittest.mock import patch
+    def test_search_similar_stackoverflow_content(self, mocker, fake_embedding_model):
+        mocks = mocker.patch.multiple(
+            "app.services.stackoverflow_service",
+            get_embedding_model=DEFAULT,
+            get_vector_db_client=DEFAULT,
+        )
         # Patch the similarity threshold to ensure all mock results are included
         with patch("app.core.config.Settings.SIMILARITY_THRESHOLD", new=0):
-            # Mock the embedding model to return a numpy array with tolist method
-            mock_embedding = MagicMock()
-            mock_embedding.tolist.return_value = [0.1, 0.2, 0.3]
-            mock_model.return_value.encode.return_value = mock_embedding
+            mocks["get_embedding_model"].return_value = fake_embedding_model
 
             # Mock the vector DB client and collection
             mock_collection = MagicMock()
-            mock_collection.query.return_value = {
-                "ids": ["id1", "id2"],
-                "metadatas": [{"type": "question"}, {"type": "answer"}],
-                "documents": ["doc1", "doc2"],
-                "distances": [0.1, 0.2]
-            }
-            mock_client.return_value.get_or_create_collection.return_value = mock_collection
+            # Only the returned dict is read, so a plain function skips MagicMock call recording
+            mock_collection.query = lambda *args, **kwargs: self._QUERY_RESULT
+            mocks["get_vector_db_client"].return_value.get_or_create_collection.return_value = mock_collection
 
             result = search_similar_stackoverflow_content("test query")
             
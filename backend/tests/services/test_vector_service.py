@@ -4,34 +4,35 @@ from datetime import datetime
 import numpy as np
 
 import app.services.vector_service as vector_service
-from app.services.embedding_service import get_embedding_model
 
-class TestVectorService:
-    @pytest.fixture
-    def mock_msg_data(self):
-        return {
-            "subject": "Test Issue",
-            "body": "Test body content",
-            "sender": "test@example.com",
-            "received_date": datetime.now(),
-            "jira_id": "PROJ-123",
-            "jira_url": "https://jira.company.com/browse/PROJ-123",
-            "recipients": ["recipient@example.com"],
-            "attachments": ["test.txt"],
-            "file_path": "/path/to/test.msg"
-        }
+# Read-only templates shared by the module; copy.copy before mutating
+@pytest.fixture(scope="module")
+def mock_msg_data():
+    return {
+        "subject": "Test Issue",
+        "body": "Test body content",
+        "sender": "test@example.com",
+        "received_date": datetime(2023, 1, 1),
+        "jira_id": "PROJ-123",
+        "jira_url": "https://jira.company.com/browse/PROJ-123",
+        "recipients": ["recipient@example.com"],
+        "attachments": ["test.txt"],
+        "file_path": "/path/to/test.msg"
+    }
+
+@pytest.fixture(scope="module")
+def mock_jira_data():
+    return {
+        "key": "PROJ-123",
+        "summary": "Test Jira Issue",
+        "description": "Test description",
+        "comments": [
+            {"author": {"displayName": "Test User"}, "body": "Test comment"}
+        ]
+    }
 
-    @pytest.fixture
-    def mock_jira_data(self):
-        return {
-            "key": "PROJ-123",
-            "summary": "Test Jira Issue",
-            "description": "Test description",
-            "comments": [
-                {"author": {"displayName": "Test User"}, "body": "Test comment"}
-            ]
-        }
 
+class TestVectorService:
     @patch('app.services.vector_service.original_add_issue_to_vectordb')
     def test_add_issue_to_vectordb(self, mock_add_issue_to_vectordb, mock_msg_data, mock_jira_data):
         mock_add_issue_to_vectordb.return_value = 'issue_20230101120000_test.msg'
@@ -40,12 +41,47 @@ class TestVectorService:
         assert result.startswith("issue_")
         mock_add_issue_to_vectordb.assert_called_once_with(mock_msg_data, mock_jira_data)
 
-    @patch('app.services.vector_service.real_delete_issue')
-    def test_delete_issue(self, mock_delete_issue):
-        mock_delete_issue.return_value = True
-        result = vector_service.delete_issue("test_issue_id")
+    def test_add_issue_to_vectordb_indexes_issue(self, patched_vector_service, mock_msg_data, fake_embedding):
+        issue_id = vector_service.add_issue_to_vectordb(mock_msg_data)
+        assert issue_id.startswith("issue_")
+        assert issue_id.endswith("_test.msg")
+        patched_vector_service.collection.add.assert_called_once()
+        add_kwargs = patched_vector_service.collection.add.call_args.kwargs
+        assert add_kwargs["ids"] == [issue_id]
+        assert len(add_kwargs["embeddings"][0]) == len(fake_embedding)
+        assert add_kwargs["metadatas"][0]["msg_subject"] == "Test Issue"
+
+    def test_add_issues_to_vectordb_embeds_batch_once(self, patched_vector_service, mock_msg_data, mock_jira_data, fake_embedding):
+        patched_vector_service.model.encode.return_value = np.tile(fake_embedding, (2, 1))
+        issue_ids = vector_service.add_issues_to_vectordb(msg_data_list=[mock_msg_data], jira_data_list=[mock_jira_data])
+        assert len(issue_ids) == 2
+        assert issue_ids[0].endswith("_test.msg")
+        assert issue_ids[1].endswith("_PROJ-123")
+        patched_vector_service.model.encode.assert_called_once()
+        patched_vector_service.collection.add.assert_called_once()
+        add_kwargs = patched_vector_service.collection.add.call_args.kwargs
+        assert add_kwargs["ids"] == issue_ids
+        assert len(add_kwargs["embeddings"]) == 2
+
+    def test_add_issues_to_vectordb_reports_build_error(self, patched_vector_service, mock_msg_data):
+        issue_ids = vector_service.add_issues_to_vectordb(msg_data_list=[mock_msg_data, {}])
+        assert issue_ids[0].endswith("_test.msg")
+        assert isinstance(issue_ids[1], ValueError)
+        assert "Either MSG data or Jira data must be provided" in str(issue_ids[1])
+        patched_vector_service.collection.add.assert_called_once()
+
+    # Thin wrappers that hand straight through to issue_service / chroma_client
+    @pytest.mark.xdist_group("chroma")
+    @pytest.mark.parametrize("fn_name, target, args, expected_args", [
+        ("delete_issue", "real_delete_issue", ("test_issue_id",), ("test_issue_id",)),
+        ("clear_all_issues", "real_clear_collection", (), ("issues",)),
+        ("clear_collection", "real_clear_collection", ("test_collection",), ("test_collection",)),
+    ])
+    def test_delegating_wrapper(self, mocker, fn_name, target, args, expected_args):
+        mock_target = mocker.patch.object(vector_service, target, return_value=True)
+        result = getattr(vector_service, fn_name)(*args)
         assert result is True
-        mock_delete_issue.assert_called_once_with("test_issue_id")
+        mock_target.assert_called_once_with(*expected_args)
 
     @patch('app.services.vector_service.real_get_issue')
     def test_get_issue(self, mock_get_issue):
@@ -73,10 +109,3 @@ class TestVectorService:
         assert results[0].similarity_score == 1.0
         assert results[1].similarity_score == 0.9
         mock_search_similar_issues.assert_called_once_with("test query", None, 10)
-
-    @patch('app.services.vector_service.real_clear_collection')
-    def test_clear_collection(self, mock_clear_collection):
-        mock_clear_collection.return_value = True
-        result = vector_service.clear_collection("test_collection")
-        assert result is True
-        mock_clear_collection.assert_called_once_with("test_collection")
\ No newline at end of file
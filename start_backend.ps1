@@ -15,6 +15,63 @@ $VectorDbDir = Join-Path -Path $DataDir -ChildPath "chroma"
 Write-Host "Starting Docker Compose services..."
 docker compose up -d chroma postgres jira confluence-postgres confluence
 
+# Check if Python is installed
+$pythonExists = Get-Command python -ErrorAction SilentlyContinue
+if (-not $pythonExists) {
+    $python3Exists = Get-Command python3 -ErrorAction SilentlyContinue
+    if (-not $python3Exists) {
+        Write-Error "Error: Python (python or python3) is not installed or not in PATH. Please install Python and try again."
+        Exit 1
+    } else {
+        $PythonExe = "python3"
+    }
+} else {
+     $PythonExe = "python"
+}
+Write-Host "Using Python executable: $PythonExe"
+
+# Check if 'uv' command exists, if not, provide instructions
+$uvExists = Get-Command uv -ErrorAction SilentlyContinue
+if (-not $uvExists) {
+    Write-Warning "'uv' command not found. Attempting to install using winget..."
+    try {
+        winget install --id astral-sh.uv --accept-package-agreements --accept-source-agreements -e
+        if ($LASTEXITCODE -ne 0) {
+            Write-Error "Error: Failed to install 'uv' using winget (Exit Code: $LASTEXITCODE). Please install it manually and ensure it's in your PATH."
+            Write-Host "You can try: pipx install uv  OR  $PythonExe -m pip install uv"
+            Exit 1
+        }
+        Write-Host "'uv' installed successfully via winget. Please restart the windows terminal and ide or ensure the PATH is updated in this session if needed."
+        # Re-check if uv is now available after installation
+        $uvExists = Get-Command uv -ErrorAction SilentlyContinue
+        if (-not $uvExists) {
+            Write-Error "Error: 'uv' command still not found after winget installation. Please check your PATH or install manually."
+            Exit 1
+        }
+        Write-Host "'uv' command is now available."
+    } catch {
+        Write-Error "An error occurred during winget installation: $($_.Exception.Message)"
+        Write-Host "Please install 'uv' manually and ensure it's in your PATH."
+        Write-Host "You can try: pipx install uv  OR  $PythonExe -m pip install uv"
+        Exit 1
+    }
+}
+
+# Install dependencies (in backend dir) in the background while the Docker services start up,
+# skipping 'uv sync' when pyproject.toml and uv.lock are unchanged since the last successful sync
+$DepsSentinel = Join-Path -Path $BackendDir -ChildPath ".venv\.deps.sha256"
+$DepsHash = (Get-FileHash -Path (Join-Path $BackendDir "pyproject.toml") -Algorithm SHA256).Hash + (Get-FileHash -Path (Join-Path $BackendDir "uv.lock") -Algorithm SHA256).Hash
+$UvSync = $null
+if ((Test-Path $DepsSentinel) -and ((Get-Content $DepsSentinel -Raw).Trim() -eq $DepsHash)) {
+    Write-Host "Dependencies up-to-date, skipping uv sync."
+} else {
+    Write-Host "Installing dependencies using uv (in the background)..."
+    # Byte-compile the installed packages once here rather than on the server's first imports
+    $UvSync = Start-Process -FilePath "uv" -ArgumentList "sync", "--compile-bytecode" -WorkingDirectory $BackendDir -NoNewWindow -PassThru
+    # Reading the handle now keeps it open, otherwise ExitCode is $null once the process exits
+    $null = $UvSync.Handle
+}
+
 # Wait for ChromaDB to be healthy
 Write-Host "Waiting for ChromaDB to be healthy..."
 $ChromaUrl = "http://localhost:8000/api/v2/heartbeat"
@@ -194,55 +251,19 @@ if ($RetryCount -eq $MaxRetries) {
     Exit 1
 }
 
-# Check if Python is installed
-$pythonExists = Get-Command python -ErrorAction SilentlyContinue
-if (-not $pythonExists) {
-    $python3Exists = Get-Command python3 -ErrorAction SilentlyContinue
-    if (-not $python3Exists) {
-        Write-Error "Error: Python (python or python3) is not installed or not in PATH. Please install Python and try again."
+# Wait for the background dependency install to finish
+if ($UvSync) {
+    $UvSync.WaitForExit()
+    if ($UvSync.ExitCode -ne 0) {
+        Write-Error "Error: 'uv sync' failed (Exit Code: $($UvSync.ExitCode))."
         Exit 1
-    } else {
-        $PythonExe = "python3"
     }
-} else {
-     $PythonExe = "python"
+    Set-Content -Path $DepsSentinel -Value $DepsHash
 }
-Write-Host "Using Python executable: $PythonExe"
 
 # Change to backend directory
 Push-Location $BackendDir
 
-# Check if 'uv' command exists, if not, provide instructions
-$uvExists = Get-Command uv -ErrorAction SilentlyContinue
-if (-not $uvExists) {
-    Write-Warning "'uv' command not found. Attempting to install using winget..."
-    try {
-        winget install --id astral-sh.uv --accept-package-agreements --accept-source-agreements -e
-        if ($LASTEXITCODE -ne 0) {
-            Write-Error "Error: Failed to install 'uv' using winget (Exit Code: $LASTEXITCODE). Please install it manually and ensure it's in your PATH."
-            Write-Host "You can try: pipx install uv  OR  $PythonExe -m pip install uv"
-            Exit 1
-        }
-        Write-Host "'uv' installed successfully via winget. Please restart the windows terminal and ide or ensure the PATH is updated in this session if needed."
-        # Re-check if uv is now available after installation
-        $uvExists = Get-Command uv -ErrorAction SilentlyContinue
-        if (-not $uvExists) {
-            Write-Error "Error: 'uv' command still not found after winget installation. Please check your PATH or install manually."
-            Exit 1
-        }
-        Write-Host "'uv' command is now available."
-    } catch {
-        Write-Error "An error occurred during winget installation: $($_.Exception.Message)"
-        Write-Host "Please install 'uv' manually and ensure it's in your PATH."
-        Write-Host "You can try: pipx install uv  OR  $PythonExe -m pip install uv"
-        Exit 1
-    }
-}
-
-# Install dependencies (in backend dir)
-Write-Host "Installing dependencies using uv..."
-uv sync
-
 # Activate virtual environment
 $VenvActivateScript = Join-Path -Path ".\.venv" -ChildPath "Scripts\Activate.ps1"
 if (Test-Path $VenvActivateScript) {
@@ -265,10 +286,35 @@ if (-not (Test-Path $EnvFilePath) -and (Test-Path $EnvExampleFilePath)) {
     Write-Warning "A default .env file has been created. Please edit it with your actual configuration."
 }
 
-# Start the FastAPI server
+# Download and load the embedding and reranker models before the server starts,
+# so the first search does not wait on a model download
+if (-not $env:BACKEND_WARM_MODELS -or $env:BACKEND_WARM_MODELS -eq "true") {
+    Write-Host "Warming up the embedding and reranker models..."
+    & $PythonExe -c "from app.services.embedding_service import get_embedding_model; from app.services.rerank_service import get_reranker; get_embedding_model(); get_reranker()"
+    if ($LASTEXITCODE -ne 0) {
+        Write-Warning "Model warm-up failed; the models will be loaded on the first request."
+    }
+}
+
+# Start the FastAPI server: auto-reload for development, or with BACKEND_RELOAD=false a
+# multi-worker server using the httptools parser (uvloop is not available on Windows)
 Write-Host "Starting FastAPI server..."
 # Use the determined Python executable
-& $PythonExe -m uvicorn app.main:app --host 0.0.0.0 --port 9000 --reload
+if (-not $env:BACKEND_RELOAD -or $env:BACKEND_RELOAD -eq "true") {
+    # Watch only the application package, not .venv or the data directories
+    & $PythonExe -m uvicorn app.main:app --host 0.0.0.0 --port 9000 --reload --reload-dir app
+} else {
+    $Workers = if ($env:BACKEND_WORKERS) { [int]$env:BACKEND_WORKERS } else { 0 }
+    if ($Workers -le 0) { $Workers = [System.Environment]::ProcessorCount }
+    # Each worker holds its own in-memory FAISS index and writes it to FAISS_INDEX_PATH,
+    # so more than one would lose ingests and race on the index file
+    if ($env:USE_FAISS -eq "true" -and $Workers -gt 1) {
+        Write-Host "WARNING: USE_FAISS=true supports a single worker; ignoring BACKEND_WORKERS=$Workers"
+        $Workers = 1
+    }
+    Write-Host "Running $Workers workers without auto-reload"
+    & $PythonExe -m uvicorn app.main:app --host 0.0.0.0 --port 9000 --http httptools --workers $Workers
+}
 
 Write-Host "Server stopped."
 
@@ -16,6 +16,68 @@ VECTOR_DB_DIR="$DATA_DIR/chroma"
 echo "Starting Docker Compose services..."
 docker compose up -d chroma postgres jira confluence-postgres confluence
 
+# Check if Python is installed
+if ! command -v python3 &> /dev/null; then
+    echo "Error: Python 3 is not installed. Please install Python 3 and try again."
+    exit 1
+fi
+
+# Prepare the backend (uv, dependencies, data directories, .env) in the background while
+# the Docker services start up; the server launch below waits for it to finish
+prepare_backend() {
+    # Change to backend directory
+    cd "$BACKEND_DIR"
+
+    # Check if 'uv' command exists, if not, install it using the provided script
+    if ! command -v uv &> /dev/null; then
+        echo "'uv' command not found. Installing 'uv'..."
+        # Install 'uv' for Linux or macOS
+        curl -LsSf https://astral.sh/uv/install.sh | sh
+        # Add $HOME/.local/bin to PATH if not already present
+        export PATH="$HOME/.local/bin:$PATH"
+    fi
+
+    # Install dependencies (in backend dir), skipping 'uv sync' when pyproject.toml and uv.lock
+    # are unchanged since the last successful sync
+    DEPS_SENTINEL=".venv/.deps.sha256"
+    SHA256_CMD="sha256sum"
+    command -v sha256sum &> /dev/null || SHA256_CMD="shasum -a 256"
+    DEPS_HASH=$(cat pyproject.toml uv.lock | $SHA256_CMD | cut -d' ' -f1)
+    if [ -f "$DEPS_SENTINEL" ] && [ "$(cat "$DEPS_SENTINEL")" = "$DEPS_HASH" ]; then
+        echo "Dependencies up-to-date, skipping uv sync."
+    else
+        echo "Installing dependencies..."
+        # Byte-compile the installed packages once here rather than on the server's first imports
+        uv sync --compile-bytecode
+        echo "$DEPS_HASH" > "$DEPS_SENTINEL"
+    fi
+
+    # Create necessary directories
+    echo "Setting up data directories..."
+    mkdir -p "$VECTOR_DB_DIR"
+
+    # Check for .env file and create from example if it doesn't exist
+    if [ ! -f ".env" ] && [ -f ".env.example" ]; then
+        echo "Creating .env file from example..."
+        cp ".env.example" ".env"
+        echo "WARNING: A default .env file has been created. Please edit it with your actual configuration."
+    fi
+
+    # Download and load the embedding and reranker models now, while the Docker services start,
+    # so the first search does not wait on a model download (this runs in a subshell, so
+    # sourcing .env here does not affect the rest of the script)
+    [ -f ".env" ] && source ".env"
+    if [ "${BACKEND_WARM_MODELS:-true}" = "true" ]; then
+        echo "Warming up the embedding and reranker models..."
+        .venv/bin/python -c "from app.services.embedding_service import get_embedding_model; from app.services.rerank_service import get_reranker; get_embedding_model(); get_reranker()" \
+            || echo "WARNING: Model warm-up failed; the models will be loaded on the first request."
+    fi
+}
+prepare_backend &
+PREPARE_PID=$!
+# Do not leave a 'uv sync' (a child of the background subshell) running if the script exits early
+trap 'pkill -P $PREPARE_PID 2>/dev/null; kill $PREPARE_PID 2>/dev/null' EXIT
+
 # Wait for ChromaDB to be healthy
 echo "Waiting for ChromaDB to be healthy..."
 until curl -s -f "http://localhost:8000/api/v2/heartbeat" > /dev/null 2>&1; do
@@ -124,45 +186,34 @@ if [ $RETRY_COUNT -eq $MAX_RETRIES ]; then
     exit 1
 fi
 
-# Check if Python is installed
-if ! command -v python3 &> /dev/null; then
-    echo "Error: Python 3 is not installed. Please install Python 3 and try again."
-    exit 1
-fi
-
-# Change to backend directory
+# Wait for the background backend preparation to finish
+wait "$PREPARE_PID"
+trap - EXIT
 cd "$BACKEND_DIR"
 
-# Check if 'uv' command exists, if not, install it using the provided script
-if ! command -v uv &> /dev/null; then
-    echo "'uv' command not found. Installing 'uv'..."
-    # Install 'uv' for Linux or macOS
-    curl -LsSf https://astral.sh/uv/install.sh | sh
-    # Add $HOME/.local/bin to PATH if not already present
-    export PATH="$HOME/.local/bin:$PATH"
-fi
-
-# Install dependencies (in backend dir)
-echo "Installing dependencies..."
-uv sync
-
 # Activate virtual environment
 echo "Activating virtual environment..."
 source .venv/bin/activate
 
-# Create necessary directories
-echo "Setting up data directories..."
-mkdir -p "$VECTOR_DB_DIR"
-
-# Check for .env file and create from example if it doesn't exist
-if [ ! -f ".env" ] && [ -f ".env.example" ]; then
-    echo "Creating .env file from example..."
-    cp ".env.example" ".env"
-    echo "WARNING: A default .env file has been created. Please edit it with your actual configuration."
-fi
-
-# Start the FastAPI server
+# Start the FastAPI server: auto-reload for development, or with BACKEND_RELOAD=false a
+# multi-worker server on the uvloop event loop and httptools parser (uvicorn[standard]).
+# uvicorn replaces this shell (exec), so it receives signals directly and no idle bash stays behind.
 echo "Starting FastAPI server..."
-python -m uvicorn app.main:app --host 0.0.0.0 --port 9000 --reload
-
-echo "Server stopped."
\ No newline at end of file
+if [ "${BACKEND_RELOAD:-true}" = "true" ]; then
+    # Watch only the application package, not .venv or the data directories
+    exec python -m uvicorn app.main:app --host 0.0.0.0 --port 9000 --reload --reload-dir app
+else
+    WORKERS=${BACKEND_WORKERS:-0}
+    if [ "$WORKERS" -le 0 ]; then
+        # getconf is answered by libc; no need to start an interpreter for the core count
+        WORKERS=$(getconf _NPROCESSORS_ONLN 2>/dev/null || echo 2)
+    fi
+    # Each worker holds its own in-memory FAISS index and writes it to FAISS_INDEX_PATH,
+    # so more than one would lose ingests and race on the index file
+    if [ "$(echo "${USE_FAISS:-false}" | tr '[:upper:]' '[:lower:]')" = "true" ] && [ "$WORKERS" -gt 1 ]; then
+        echo "WARNING: USE_FAISS=true supports a single worker; ignoring BACKEND_WORKERS=$WORKERS"
+        WORKERS=1
+    fi
+    echo "Running $WORKERS workers without auto-reload"
+    exec python -m uvicorn app.main:app --host 0.0.0.0 --port 9000 --loop uvloop --http httptools --workers "$WORKERS"
+fi
\ No newline at end of file